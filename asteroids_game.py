@@ -5,10 +5,16 @@ import sys
 import json
 import numpy as np
 import time
-
-pygame.init()
-pygame.mixer.pre_init(frequency=44100, size=-16, channels=2, buffer=512)
-pygame.mixer.init()
+import threading
+import queue
+import os
+import hashlib
+import zlib
+import concurrent.futures
+import argparse
+import itertools
+import collections
+import struct
 
 WIDTH = 800
 HEIGHT = 600
@@ -42,535 +48,842 @@ HOT_PINK = (255, 20, 147)
 ELECTRIC_BLUE = (125, 249, 255)
 
 FPS = 60
+# Simulation always advances in fixed 1/FPS steps; rendering runs at its own rate
+SIM_DT = 1.0 / FPS
+MAX_FRAME_TIME = 0.25  # Longest frame the simulation will try to catch up on
+
+# Opened by init_display(); headless runs never touch the display or audio
+screen = None
+clock = None
+
+def init_audio():
+    pygame.mixer.pre_init(frequency=44100, size=-16, channels=2, buffer=512)
+    pygame.mixer.init()
 
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Enhanced Asteroids")
-clock = pygame.time.Clock()
+def init_display():
+    global screen, clock
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Enhanced Asteroids")
+    clock = pygame.time.Clock()
 
 HIGHSCORE_FILE = "highscore.json"
 
+class RandomStreams:
+    # Separate random streams for gameplay, visual effects and audio, all
+    # derived from one session seed. Cosmetic draws never shift the gameplay
+    # sequence, so the seed plus the player's input reproduces a game exactly.
+    # gameplay is a NumPy PCG64 Generator for batched draws; visual and audio
+    # are random.Random instances, which are faster for one-off scalars.
+    def __init__(self, seed=None):
+        self.reseed(seed)
+
+    def reseed(self, seed=None):
+        if seed is None:
+            seed = random.SystemRandom().randrange(2**32)
+        self.session_seed = seed
+        gameplay, visual, audio = np.random.SeedSequence(seed).spawn(3)
+        self.gameplay = np.random.Generator(np.random.PCG64(gameplay))
+        self.visual = random.Random(int(visual.generate_state(1, np.uint64)[0]))
+        self.audio = random.Random(int(audio.generate_state(1, np.uint64)[0]))
+        # For SoundManager, whose per-sound synthesizers seed themselves
+        self.audio_seed = int(audio.generate_state(2, np.uint64)[1])
+
+    def game_seed(self):
+        # Seed for the next game of the session, so a whole session still
+        # follows from the session seed
+        return int(self.gameplay.integers(2**32))
+
+rng = RandomStreams()
+
+# Visual detail levels, best first. emission scales every particle burst,
+# particle_trail/bullet_trail are how many trail positions are drawn, glow_rings
+# the outer rings around large asteroids, and twinkle_groups how many groups
+# the starfield is split into (one group is redrawn per frame).
+QualityLevel = collections.namedtuple('QualityLevel',
+                                      ['name', 'emission', 'particle_trail', 'bullet_trail', 'glow_rings', 'twinkle_groups'])
+QUALITY_LEVELS = (
+    QualityLevel('high', 1.0, 5, 8, 2, 8),
+    QualityLevel('medium', 0.75, 4, 6, 1, 16),
+    QualityLevel('low', 0.5, 3, 4, 1, 32),
+    QualityLevel('minimal', 0.25, 2, 2, 0, 64),
+)
+QUALITY_SMOOTHING = 0.1  # Weight of the newest frame in the moving average
+QUALITY_OVERLOAD = 0.9  # Share of the frame budget above which quality drops
+QUALITY_HEADROOM = 0.6  # Share of the frame budget below which quality may rise
+QUALITY_DOWN_FRAMES = 30  # Overloaded frames in a row before dropping a level
+QUALITY_UP_FRAMES = 180  # Frames with headroom in a row before raising one
+QUALITY_MAX_UP_FRAMES = 180 * 16
+
+class QualityGovernor:
+    # Picks a QUALITY_LEVELS entry from the measured frame time. Quality drops
+    # a level once the moving average has been over QUALITY_OVERLOAD of the
+    # budget for QUALITY_DOWN_FRAMES frames, and rises one only after a much
+    # longer run under QUALITY_HEADROOM. If a raise is undone before it has
+    # lasted that long, the wait before the next raise doubles, so a level
+    # that does not fit is not retried every few seconds.
+    def __init__(self, budget=SIM_DT, fixed_level=None):
+        self.reset(budget, fixed_level)
+
+    def reset(self, budget=SIM_DT, fixed_level=None):
+        # fixed_level pins quality to that index and turns the governor off
+        self.budget = budget
+        self.fixed_level = fixed_level
+        self.average = 0.0
+        self.frames = 0
+        self.raised_at = None
+        self.up_frames = QUALITY_UP_FRAMES
+        self.set_level(fixed_level or 0)
+
+    def set_level(self, level):
+        self.level = level
+        self.settings = QUALITY_LEVELS[level]
+        self.over = 0
+        self.under = 0
+
+    def scaled(self, count):
+        # Particles to emit for a burst of count at full quality
+        return max(1, round(count * self.settings.emission))
+
+    def update(self, frame_seconds):
+        if self.fixed_level is not None:
+            return
+        self.frames += 1
+        self.average += (min(frame_seconds, MAX_FRAME_TIME) - self.average) * QUALITY_SMOOTHING
+        load = self.average / self.budget
+        if load > QUALITY_OVERLOAD:
+            self.over += 1
+            self.under = 0
+        elif load < QUALITY_HEADROOM:
+            self.under += 1
+            self.over = 0
+        else:
+            self.over = 0
+            self.under = 0
+
+        if self.over >= QUALITY_DOWN_FRAMES and self.level < len(QUALITY_LEVELS) - 1:
+            if self.raised_at is not None and self.frames - self.raised_at < self.up_frames:
+                self.up_frames = min(self.up_frames * 2, QUALITY_MAX_UP_FRAMES)
+            self.set_level(self.level + 1)
+        elif self.under >= self.up_frames and self.level > 0:
+            self.raised_at = self.frames
+            self.set_level(self.level - 1)
+
+quality = QualityGovernor()
+
+SAMPLE_RATE = 44100
+
+# Extended chord progression in A minor with more sophisticated harmony
+MUSIC_CHORDS = np.array([
+    [220, 262, 330],    # A minor
+    [294, 349, 440],    # D minor
+    [262, 311, 392],    # C major
+    [349, 415, 523],    # F major
+    [247, 294, 370],    # B diminished
+    [330, 392, 494],    # E minor
+    [294, 370, 440],    # D minor
+    [220, 277, 330],    # A minor
+])
+MUSIC_BASS = np.array([
+    [110, 165], [147, 220], [131, 196], [174, 261],
+    [123, 185], [165, 247], [147, 220], [110, 165],
+])
+MUSIC_CHORD_LENGTH = 5.625
+MUSIC_BLOCK_DURATION = 0.5
+MUSIC_LOOP_DURATION = 45  # Seconds in the pre-rendered loop used without streaming
+# Impulse response of the ambient one-pole low-pass, truncated below float precision
+AMBIENT_FILTER_TAPS = 0.7 * 0.3 ** np.arange(24)
+
+SOUND_CACHE_DIR = ".sound_cache"
+SOUND_CACHE_MAX_BYTES = 64 * 1024 * 1024
+# Bump whenever a render_* recipe changes so stale waveforms are never loaded
+SOUND_CACHE_VERSION = 1
+
+class Synthesizer:
+    # Whole-array waveform building blocks shared by every SoundManager sound.
+    # All generators work on a time vector in seconds, so a sound is a handful
+    # of NumPy expressions instead of a Python loop over ~10k samples.
+    def __init__(self, sample_rate=SAMPLE_RATE, seed=None):
+        self.sample_rate = sample_rate
+        self.rng = np.random.default_rng(seed)
+
+    def time_vector(self, duration):
+        frames = int(duration * self.sample_rate)
+        return np.arange(frames) / self.sample_rate
+
+    def sine(self, frequency, t):
+        # Frequency may be a scalar or an array (for sweeps and FM)
+        return np.sin(frequency * 2 * np.pi * t)
+
+    def decay(self, t, rate):
+        return np.exp(-t * rate)
+
+    def attack_decay(self, t, decay_rate, attack_rate):
+        # Sharp attack followed by exponential decay
+        return np.exp(-t * decay_rate) * (1 - np.exp(-t * attack_rate))
+
+    def noise(self, frames, low=-1.0, high=1.0):
+        return self.rng.uniform(low, high, frames)
+
+    def pan(self, wave, t, rate, depth):
+        # Slow left/right swing around the centre for stereo width
+        swing = depth * np.sin(t * rate)
+        return wave * (1 - depth + swing), wave * (1 - depth - swing)
+
+    def to_stereo(self, left, right, volume):
+        stereo = np.stack((left, right), axis=1) * volume
+        # Truncate toward zero like int() and keep inside the 16-bit range
+        return np.clip(stereo, -32768, 32767).astype(np.int16)
+
+class SoundCache:
+    # Rendered int16 waveforms stored as .npy files, keyed by a hash of the
+    # generator name, its parameters, the sample rate and the cache version.
+    # Files are memory-mapped on load and the least recently used ones are
+    # deleted once the directory grows past max_bytes.
+    def __init__(self, directory=SOUND_CACHE_DIR, max_bytes=SOUND_CACHE_MAX_BYTES, version=SOUND_CACHE_VERSION):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.version = version
+
+    def key(self, name, params):
+        description = json.dumps([name, list(params), SAMPLE_RATE, self.version])
+        return hashlib.sha1(description.encode('utf-8')).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + '.npy')
+
+    def load(self, key):
+        path = self.path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            sound_array = np.load(path, mmap_mode='r')
+            os.utime(path)  # Mark as recently used for pruning
+            return sound_array
+        except (OSError, ValueError):
+            # Corrupt or truncated entry, render it again
+            self.remove(path)
+            return None
+
+    def store(self, key, sound_array):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            temp_path = self.path(key) + '.tmp'
+            with open(temp_path, 'wb') as f:
+                np.save(f, sound_array)
+            os.replace(temp_path, self.path(key))
+            self.prune()
+        except OSError:
+            pass
+
+    def entries(self):
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        entries = []
+        for name in names:
+            if name.endswith('.npy'):
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return sorted(entries)
+
+    def prune(self):
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self.remove(path)
+            total -= size
+
+    def remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def clear(self):
+        for _, _, path in self.entries():
+            self.remove(path)
+
+class MusicStream:
+    # Feeds an endless generator of int16 blocks to a reserved mixer channel.
+    # A worker thread keeps a few blocks synthesized ahead; the game loop hands
+    # them to Channel.queue from update() so playback never waits for a full loop.
+    def __init__(self, blocks, queue_size=3):
+        self.blocks = blocks
+        self.ready_blocks = queue.Queue(maxsize=queue_size)
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.channel = None
+        self.volume = 1.0
+
+    def start(self, volume):
+        self.volume = volume
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.produce, daemon=True)
+            self.thread.start()
+        if self.channel is None:
+            pygame.mixer.set_reserved(1)
+            self.channel = pygame.mixer.Channel(0)
+        self.channel.set_volume(self.volume)
+        self.update()
+
+    def produce(self):
+        for block in self.blocks:
+            while not self.stop_event.is_set():
+                try:
+                    self.ready_blocks.put(block, timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+            if self.stop_event.is_set():
+                return
+
+    def update(self):
+        if self.channel is None or self.channel.get_queue() is not None:
+            return
+        try:
+            block = self.ready_blocks.get_nowait()
+        except queue.Empty:
+            return
+        sound = pygame.sndarray.make_sound(block)
+        if self.channel.get_busy():
+            self.channel.queue(sound)
+        else:
+            self.channel.play(sound)
+
+    def set_volume(self, volume):
+        self.volume = volume
+        if self.channel:
+            self.channel.set_volume(volume)
+
+    def stop(self):
+        self.stop_event.set()
+        if self.channel:
+            self.channel.stop()
+
 class SoundManager:
-    def __init__(self):
+    def __init__(self, seed=None, cache=None, start_music=True):
         self.sounds = {}
+        self.seed = seed
+        # Rendered waveforms are reused across launches unless cache is False
+        self.cache = SoundCache() if cache is None else cache
         self.music_volume = 0.3
         self.sfx_volume = 0.7
         self.music_enabled = True
         self.sfx_enabled = True
         self.background_music = None
-        self.create_sounds()
-        self.start_background_music()
+        # Stream the music in blocks; False pre-renders the 45 second loop instead
+        self.music_streaming = True
+        self.music_stream = None
+        # Effects are synthesized on first play() or by warm_up() in the background
+        self.load_lock = threading.Lock()
+        self.warm_up_executor = None
+        self.warm_up_futures = {}
+        self.ready = threading.Event()
+        if start_music:
+            self.start_background_music()
+
+    # Effect name -> (generator, params), then a plain tone if the generator fails
+    effects = {
+        'shoot': (('create_enhanced_laser', (600, 0.1)), ('create_simple_tone', (440, 0.1))),
+        'explosion': (('create_enhanced_explosion', (0.4,)), ('create_simple_tone', (220, 0.3))),
+        'thrust': (('create_enhanced_thrust', (180, 0.2)), ('create_simple_tone', (180, 0.2))),
+        'menu_select': (('create_tone', (880, 0.05)), ('create_simple_tone', (880, 0.05))),
+        'menu_confirm': (('create_tone_sweep', (440, 880, 0.1)), ('create_simple_tone', (660, 0.1))),
+        'shield_activate': (('create_shield_sound', (0.3,)), ('create_simple_tone', (440, 0.2))),
+        'coin_collect': (('create_coin_sound', (0.2,)), ('create_simple_tone', (660, 0.1))),
+        'powerup': (('create_powerup_sound', (0.3,)), ('create_simple_tone', (880, 0.2))),
+    }
 
     def create_sounds(self):
-        try:
-            self.sounds['shoot'] = self.create_enhanced_laser(600, 0.1)
-            self.sounds['explosion'] = self.create_enhanced_explosion(0.4)
-            self.sounds['thrust'] = self.create_enhanced_thrust(180, 0.2)
-            self.sounds['menu_select'] = self.create_tone(880, 0.05)
-            self.sounds['menu_confirm'] = self.create_tone_sweep(440, 880, 0.1)
-            self.sounds['shield_activate'] = self.create_shield_sound(0.3)
-            self.sounds['coin_collect'] = self.create_coin_sound(0.2)
-            self.sounds['powerup'] = self.create_powerup_sound(0.3)
-        except:
-            # Fallback to simple sounds
+        for sound_name in self.effects:
+            self.load_sound(sound_name)
+
+    def load_sound(self, sound_name):
+        with self.load_lock:
+            if sound_name in self.sounds:
+                return self.sounds[sound_name]
+        for method, params in self.effects[sound_name]:
             try:
-                self.sounds['shoot'] = self.create_simple_tone(440, 0.1)
-                self.sounds['explosion'] = self.create_simple_tone(220, 0.3)
-                self.sounds['thrust'] = self.create_simple_tone(180, 0.2)
-                self.sounds['menu_select'] = self.create_simple_tone(880, 0.05)
-                self.sounds['menu_confirm'] = self.create_simple_tone(660, 0.1)
-                self.sounds['shield_activate'] = self.create_simple_tone(440, 0.2)
-                self.sounds['coin_collect'] = self.create_simple_tone(660, 0.1)
-                self.sounds['powerup'] = self.create_simple_tone(880, 0.2)
+                sound = getattr(self, method)(*params)
+                break
             except:
-                self.sounds = {}
-
-    def create_enhanced_laser(self, frequency, duration):
-        sample_rate = 44100
-        frames = int(duration * sample_rate)
-        arr = []
-
-        for i in range(frames):
-            t = i / sample_rate
-            progress = t / duration
-
-            # Multi-layered laser sound with realistic sci-fi characteristics
-
-            # Main laser frequency with dramatic sweep
-            main_freq = frequency * (1.5 - progress * 0.8)  # Frequency drops dramatically
-            main_wave = math.sin(main_freq * 2 * math.pi * t)
-
-            # High-frequency zap component
-            zap_freq = frequency * 3 + 1000 * math.sin(t * 80)
-            zap_wave = 0.3 * math.sin(zap_freq * 2 * math.pi * t)
+                # Fallback to simple sounds
+                continue
+        else:
+            return None
+        with self.load_lock:
+            return self.sounds.setdefault(sound_name, sound)
 
-            # Electric crackle effect
-            crackle = 0.1 * random.uniform(-1, 1) * math.exp(-t * 25)
+    def warm_up(self):
+        # Safe to call every frame; only the first call submits work
+        if self.warm_up_executor is not None:
+            return
+        self.warm_up_executor = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+        for sound_name in self.effects:
+            self.warm_up_futures[sound_name] = self.warm_up_executor.submit(self.load_sound, sound_name)
+        self.warm_up_executor.submit(self.finish_warm_up)
+
+    def finish_warm_up(self):
+        concurrent.futures.wait(self.warm_up_futures.values())
+        self.ready.set()
+
+    def is_ready(self):
+        return self.ready.is_set()
+
+    def create_synth(self, name, params):
+        # Each sound gets its own noise stream, so results do not depend on the
+        # order (or thread) in which sounds are generated
+        if self.seed is None:
+            return Synthesizer()
+        spawn_key = (zlib.crc32(repr((name, params)).encode('utf-8')),)
+        return Synthesizer(seed=np.random.SeedSequence(self.seed, spawn_key=spawn_key))
+
+    def build_sound(self, name, render, *params):
+        return pygame.sndarray.make_sound(self.sound_array(name, render, *params))
+
+    def sound_array(self, name, render, *params):
+        # The int16 waveform, from the cache when there is one; needs no mixer
+        synth = self.create_synth(name, params)
+        if not self.cache:
+            return render(synth, *params)
+        key = self.cache.key(name, params + (self.seed,))
+        sound_array = self.cache.load(key)
+        if sound_array is None:
+            sound_array = render(synth, *params)
+            self.cache.store(key, sound_array)
+        return sound_array
+
+    def warm_cache(self):
+        # Render every effect into the cache, plus the music loop when it is
+        # pre-rendered rather than streamed. Only arrays are built, so this
+        # works without an audio device. create_<name> renders with render_<name>.
+        for (method, params), fallback in self.effects.values():
+            name = method[len('create_'):]
+            self.sound_array(name, getattr(self, 'render_' + name), *params)
+        if not self.music_streaming:
+            self.sound_array('background_music', self.render_background_music, MUSIC_LOOP_DURATION)
 
-            # Sub-bass thump at the beginning
-            bass_freq = 60
-            bass_wave = 0.4 * math.sin(bass_freq * 2 * math.pi * t) * math.exp(-t * 30)
+    def create_enhanced_laser(self, frequency, duration):
+        return self.build_sound('enhanced_laser', self.render_enhanced_laser, frequency, duration)
 
-            # Sharp attack envelope with quick decay
-            envelope = math.exp(-t * 18) * (1 - math.exp(-t * 100))
+    def create_enhanced_explosion(self, duration):
+        return self.build_sound('enhanced_explosion', self.render_enhanced_explosion, duration)
 
-            # Combine all components
-            wave = envelope * (main_wave * 0.6 + zap_wave + crackle + bass_wave)
+    def create_enhanced_thrust(self, frequency, duration):
+        return self.build_sound('enhanced_thrust', self.render_enhanced_thrust, frequency, duration)
 
-            # Add slight stereo separation for width
-            left_channel = wave * (0.9 + 0.1 * math.sin(t * 40))
-            right_channel = wave * (0.9 - 0.1 * math.sin(t * 40))
+    def create_tone(self, frequency, duration):
+        return self.build_sound('tone', self.render_tone, frequency, duration)
 
-            wave_value = 4000 * wave
-            arr.append([int(wave_value * left_channel), int(wave_value * right_channel)])
+    def create_simple_tone(self, frequency, duration):
+        return self.build_sound('simple_tone', self.render_simple_tone, frequency, duration)
 
-        sound_array = np.array(arr, dtype=np.int16)
-        sound = pygame.sndarray.make_sound(sound_array)
-        return sound
+    def create_tone_sweep(self, start_freq, end_freq, duration):
+        return self.build_sound('tone_sweep', self.render_tone_sweep, start_freq, end_freq, duration)
 
-    def create_enhanced_explosion(self, duration):
-        sample_rate = 44100
-        frames = int(duration * sample_rate)
-        arr = []
-
-        for i in range(frames):
-            t = i / sample_rate
-            progress = t / duration
-
-            # INTENSE multi-layered explosion with maximum impact
-
-            # MASSIVE initial blast - ultra-sharp attack with deep sub-bass
-            blast_envelope = math.exp(-t * 18) * (1 - math.exp(-t * 300))
-            # Multiple sub-bass frequencies for earth-shaking effect
-            sub_bass1 = 1.2 * math.sin(35 * 2 * math.pi * t) * blast_envelope
-            sub_bass2 = 0.8 * math.sin(55 * 2 * math.pi * t) * blast_envelope
-            sub_bass3 = 0.6 * math.sin(75 * 2 * math.pi * t) * blast_envelope
-
-            # AGGRESSIVE mid-frequency explosion core
-            core_envelope = math.exp(-t * 6) * (1 - progress * 0.2)
-            core_freq1 = 150 + 80 * math.sin(t * 4)
-            core_freq2 = 200 + 60 * math.sin(t * 7)
-            core_freq3 = 180 + 100 * math.sin(t * 5)
-            explosion_core = 0.9 * (
-                math.sin(core_freq1 * 2 * math.pi * t) +
-                math.sin(core_freq2 * 2 * math.pi * t) +
-                math.sin(core_freq3 * 2 * math.pi * t)
-            ) * core_envelope
-
-            # CHAOTIC high-frequency debris field
-            debris_envelope = math.exp(-t * 12) * random.uniform(0.7, 1.3)
-            # Multiple debris layers for chaos
-            debris1 = 0.5 * random.uniform(-1, 1) * debris_envelope
-            debris2 = 0.4 * random.uniform(-1, 1) * debris_envelope * math.sin(t * 100)
-            debris3 = 0.3 * random.uniform(-1, 1) * debris_envelope * math.sin(t * 200)
-            total_debris = debris1 + debris2 + debris3
-
-            # PIERCING metallic shrapnel with multiple frequencies
-            shrapnel_envelope = math.exp(-t * 30) * (1 - math.exp(-t * 150))
-            shrapnel_freq1 = 2500 + 800 * math.sin(t * 15)
-            shrapnel_freq2 = 3200 + 600 * math.sin(t * 20)
-            shrapnel_freq3 = 4000 + 400 * math.sin(t * 25)
-            metallic_shrapnel = 0.4 * shrapnel_envelope * (
-                math.sin(shrapnel_freq1 * 2 * math.pi * t) +
-                0.7 * math.sin(shrapnel_freq2 * 2 * math.pi * t) +
-                0.5 * math.sin(shrapnel_freq3 * 2 * math.pi * t)
-            )
-
-            # VIOLENT air displacement and shockwave
-            shockwave_envelope = (1 - progress * 0.5) * math.exp(-t * 3)
-            shockwave1 = 0.7 * random.uniform(-1, 1) * shockwave_envelope
-            shockwave2 = 0.5 * random.uniform(-1, 1) * shockwave_envelope * math.sin(t * 50)
-            total_shockwave = shockwave1 + shockwave2
-
-            # CRACKLING electrical discharge (like from destroyed electronics)
-            if t < 0.2:  # Only in first 0.2 seconds
-                electrical_envelope = math.exp(-t * 25) * random.uniform(0.8, 1.2)
-                electrical_crackle = 0.3 * electrical_envelope * random.choice([-1, 1]) * random.uniform(0.5, 1.0)
-            else:
-                electrical_crackle = 0
-
-            # SECONDARY explosion resonance
-            if t > 0.05 and t < 0.25:  # Secondary blast between 0.05-0.25 seconds
-                secondary_t = t - 0.05
-                secondary_envelope = math.exp(-secondary_t * 20) * (1 - math.exp(-secondary_t * 100))
-                secondary_freq = 90 + 40 * math.sin(secondary_t * 8)
-                secondary_blast = 0.6 * math.sin(secondary_freq * 2 * math.pi * secondary_t) * secondary_envelope
-            else:
-                secondary_blast = 0
+    def create_shield_sound(self, duration):
+        return self.build_sound('shield_sound', self.render_shield_sound, duration)
 
-            # Combine ALL layers for MAXIMUM IMPACT
-            wave = (sub_bass1 + sub_bass2 + sub_bass3 + explosion_core +
-                   total_debris + metallic_shrapnel + total_shockwave +
-                   electrical_crackle + secondary_blast)
+    def create_coin_sound(self, duration):
+        return self.build_sound('coin_sound', self.render_coin_sound, duration)
 
-            # AGGRESSIVE dynamic range compression for MASSIVE impact
-            wave_abs = abs(wave)
-            if wave_abs > 1.0:
+    def create_powerup_sound(self, duration):
+        return self.build_sound('powerup_sound', self.render_powerup_sound, duration)
+
+    def render_enhanced_laser(self, synth, frequency, duration):
+        t = synth.time_vector(duration)
+        progress = t / duration
+
+        # Multi-layered laser sound with realistic sci-fi characteristics
+
+        # Main laser frequency with dramatic sweep
+        main_freq = frequency * (1.5 - progress * 0.8)  # Frequency drops dramatically
+        main_wave = synth.sine(main_freq, t)
+
+        # High-frequency zap component
+        zap_freq = frequency * 3 + 1000 * np.sin(t * 80)
+        zap_wave = 0.3 * synth.sine(zap_freq, t)
+
+        # Electric crackle effect
+        crackle = 0.1 * synth.noise(len(t)) * synth.decay(t, 25)
+
+        # Sub-bass thump at the beginning
+        bass_wave = 0.4 * synth.sine(60, t) * synth.decay(t, 30)
+
+        # Sharp attack envelope with quick decay
+        envelope = synth.attack_decay(t, 18, 100)
+
+        # Combine all components
+        wave = envelope * (main_wave * 0.6 + zap_wave + crackle + bass_wave)
+
+        # Add slight stereo separation for width
+        left_channel, right_channel = synth.pan(wave, t, 40, 0.1)
+
+        # The laser is scaled by its own waveform, which gives it the bite
+        return synth.to_stereo(wave * left_channel, wave * right_channel, 4000)
+
+    def render_enhanced_explosion(self, synth, duration):
+        t = synth.time_vector(duration)
+        frames = len(t)
+        progress = t / duration
+
+        # INTENSE multi-layered explosion with maximum impact
+
+        # MASSIVE initial blast - ultra-sharp attack with deep sub-bass
+        blast_envelope = synth.attack_decay(t, 18, 300)
+        # Multiple sub-bass frequencies for earth-shaking effect
+        sub_bass = (1.2 * synth.sine(35, t) +
+                    0.8 * synth.sine(55, t) +
+                    0.6 * synth.sine(75, t)) * blast_envelope
+
+        # AGGRESSIVE mid-frequency explosion core
+        core_envelope = synth.decay(t, 6) * (1 - progress * 0.2)
+        explosion_core = 0.9 * (
+            synth.sine(150 + 80 * np.sin(t * 4), t) +
+            synth.sine(200 + 60 * np.sin(t * 7), t) +
+            synth.sine(180 + 100 * np.sin(t * 5), t)
+        ) * core_envelope
+
+        # CHAOTIC high-frequency debris field
+        debris_envelope = synth.decay(t, 12) * synth.noise(frames, 0.7, 1.3)
+        # Multiple debris layers for chaos
+        total_debris = debris_envelope * (
+            0.5 * synth.noise(frames) +
+            0.4 * synth.noise(frames) * np.sin(t * 100) +
+            0.3 * synth.noise(frames) * np.sin(t * 200)
+        )
+
+        # PIERCING metallic shrapnel with multiple frequencies
+        shrapnel_envelope = synth.attack_decay(t, 30, 150)
+        metallic_shrapnel = 0.4 * shrapnel_envelope * (
+            synth.sine(2500 + 800 * np.sin(t * 15), t) +
+            0.7 * synth.sine(3200 + 600 * np.sin(t * 20), t) +
+            0.5 * synth.sine(4000 + 400 * np.sin(t * 25), t)
+        )
+
+        # VIOLENT air displacement and shockwave
+        shockwave_envelope = (1 - progress * 0.5) * synth.decay(t, 3)
+        total_shockwave = shockwave_envelope * (
+            0.7 * synth.noise(frames) +
+            0.5 * synth.noise(frames) * np.sin(t * 50)
+        )
+
+        # CRACKLING electrical discharge (like from destroyed electronics)
+        polarity = synth.rng.choice((-1, 1), frames)
+        electrical_crackle = np.where(
+            t < 0.2,  # Only in first 0.2 seconds
+            0.3 * synth.decay(t, 25) * synth.noise(frames, 0.8, 1.2) * polarity * synth.noise(frames, 0.5, 1.0),
+            0
+        )
+
+        # SECONDARY explosion resonance between 0.05-0.25 seconds
+        secondary_t = t - 0.05
+        secondary_envelope = synth.attack_decay(secondary_t, 20, 100)
+        secondary_freq = 90 + 40 * np.sin(secondary_t * 8)
+        secondary_blast = np.where(
+            (t > 0.05) & (t < 0.25),
+            0.6 * synth.sine(secondary_freq, secondary_t) * secondary_envelope,
+            0
+        )
+
+        # Combine ALL layers for MAXIMUM IMPACT
+        wave = (sub_bass + explosion_core + total_debris + metallic_shrapnel +
+                total_shockwave + electrical_crackle + secondary_blast)
+
+        # AGGRESSIVE dynamic range compression for MASSIVE impact
+        wave_abs = np.abs(wave)
+        safe_abs = np.maximum(wave_abs, 1e-12)
+        wave = np.select(
+            [wave_abs > 1.0, wave_abs > 0.8],
+            [
                 # Hard limiting with saturation
-                wave = wave / wave_abs * (1.0 + (wave_abs - 1.0) * 0.1)
-            elif wave_abs > 0.8:
+                wave / safe_abs * (1.0 + (wave_abs - 1.0) * 0.1),
                 # Soft compression
-                compressed_amount = (wave_abs - 0.8) / 0.2
-                wave = wave * (0.8 + compressed_amount * 0.15) / wave_abs
-
-            # EXTREME stereo width for immersive destruction
-            left_chaos = 0.85 + 0.15 * random.uniform(-1, 1)
-            right_chaos = 0.85 + 0.15 * random.uniform(-1, 1)
-
-            # Add slight delay between channels for width
-            if i > 5:  # Small delay offset
-                delayed_wave = wave * 0.3  # 30% delayed signal
-                left_final = wave * left_chaos + delayed_wave * 0.2
-                right_final = wave * right_chaos + delayed_wave * 0.2
-            else:
-                left_final = wave * left_chaos
-                right_final = wave * right_chaos
-
-            # MAXIMUM volume for devastating impact
-            wave_value = 7500  # Increased from 5000
-            arr.append([int(wave_value * left_final), int(wave_value * right_final)])
-
-        sound_array = np.array(arr, dtype=np.int16)
-        sound = pygame.sndarray.make_sound(sound_array)
-        return sound
+                wave * (0.8 + (wave_abs - 0.8) / 0.2 * 0.15) / safe_abs
+            ],
+            wave
+        )
 
-    def create_enhanced_thrust(self, frequency, duration):
-        sample_rate = 44100
-        frames = int(duration * sample_rate)
-        arr = []
-
-        for i in range(frames):
-            t = i / sample_rate
-            progress = t / duration
-
-            # Realistic rocket engine sound with multiple components
-
-            # Main engine burn - low frequency with harmonics
-            main_freq = frequency + 20 * math.sin(t * 8)  # Slight frequency variation
-            fundamental = 0.4 * math.sin(main_freq * 2 * math.pi * t)
-
-            # Engine harmonics for richness
-            harmonic2 = 0.2 * math.sin(main_freq * 2 * 2 * math.pi * t)
-            harmonic3 = 0.1 * math.sin(main_freq * 3 * 2 * math.pi * t)
-
-            # Combustion noise - filtered white noise
-            combustion_intensity = 0.6 + 0.4 * math.sin(t * 12)
-            combustion_noise = combustion_intensity * random.uniform(-0.5, 0.5)
+        # EXTREME stereo width for immersive destruction
+        left_chaos = 0.85 + 0.15 * synth.noise(frames)
+        right_chaos = 0.85 + 0.15 * synth.noise(frames)
 
-            # High-frequency gas hiss
-            hiss_intensity = 0.3 + 0.2 * math.sin(t * 25)
-            gas_hiss = hiss_intensity * random.uniform(-0.2, 0.2)
+        # Add a 30% doubled signal after a small offset for width
+        doubled = np.where(np.arange(frames) > 5, wave * 0.3 * 0.2, 0)
+        left_final = wave * left_chaos + doubled
+        right_final = wave * right_chaos + doubled
 
-            # Engine vibration - subtle tremolo effect
-            vibration_freq = 30 + 10 * math.sin(t * 4)
-            vibration = 1 + 0.15 * math.sin(vibration_freq * 2 * math.pi * t)
+        # MAXIMUM volume for devastating impact
+        return synth.to_stereo(left_final, right_final, 7500)
 
-            # Sub-bass rumble for power feeling
-            rumble = 0.3 * math.sin(80 * 2 * math.pi * t) * (0.8 + 0.2 * math.sin(t * 6))
+    def render_enhanced_thrust(self, synth, frequency, duration):
+        t = synth.time_vector(duration)
+        frames = len(t)
+        progress = t / duration
 
-            # Doppler-like pitch modulation
-            doppler_mod = 1 + 0.05 * math.sin(t * 15)
+        # Realistic rocket engine sound with multiple components
 
-            # Combine all engine components
-            engine_sound = (fundamental + harmonic2 + harmonic3) * vibration * doppler_mod
-            engine_sound += combustion_noise + gas_hiss + rumble
+        # Main engine burn - low frequency with harmonics
+        main_freq = frequency + 20 * np.sin(t * 8)  # Slight frequency variation
+        fundamental = 0.4 * synth.sine(main_freq, t)
 
-            # Envelope for natural attack and sustain
-            envelope = min(1.0, t * 5)  # Quick attack
-            if progress > 0.8:  # Fade out in last 20%
-                envelope *= (1 - (progress - 0.8) / 0.2)
+        # Engine harmonics for richness
+        harmonic2 = 0.2 * synth.sine(main_freq * 2, t)
+        harmonic3 = 0.1 * synth.sine(main_freq * 3, t)
 
-            wave = engine_sound * envelope
+        # Combustion noise - filtered white noise
+        combustion_intensity = 0.6 + 0.4 * np.sin(t * 12)
+        combustion_noise = combustion_intensity * synth.noise(frames, -0.5, 0.5)
 
-            # Stereo width with engine pan
-            left_engine = wave * (0.95 + 0.05 * math.sin(t * 7))
-            right_engine = wave * (0.95 - 0.05 * math.sin(t * 7))
+        # High-frequency gas hiss
+        hiss_intensity = 0.3 + 0.2 * np.sin(t * 25)
+        gas_hiss = hiss_intensity * synth.noise(frames, -0.2, 0.2)
 
-            wave_value = 3000
-            arr.append([int(wave_value * left_engine), int(wave_value * right_engine)])
+        # Engine vibration - subtle tremolo effect
+        vibration_freq = 30 + 10 * np.sin(t * 4)
+        vibration = 1 + 0.15 * synth.sine(vibration_freq, t)
 
-        sound_array = np.array(arr, dtype=np.int16)
-        sound = pygame.sndarray.make_sound(sound_array)
-        return sound
+        # Sub-bass rumble for power feeling
+        rumble = 0.3 * synth.sine(80, t) * (0.8 + 0.2 * np.sin(t * 6))
 
-    def create_tone(self, frequency, duration):
-        sample_rate = 44100
-        frames = int(duration * sample_rate)
-        arr = []
+        # Doppler-like pitch modulation
+        doppler_mod = 1 + 0.05 * np.sin(t * 15)
 
-        for i in range(frames):
-            t = i / sample_rate
+        # Combine all engine components
+        engine_sound = (fundamental + harmonic2 + harmonic3) * vibration * doppler_mod
+        engine_sound += combustion_noise + gas_hiss + rumble
 
-            # Clean menu selection tone with subtle character
+        # Envelope for natural attack and sustain
+        envelope = np.minimum(1.0, t * 5)  # Quick attack
+        # Fade out in last 20%
+        envelope = np.where(progress > 0.8, envelope * (1 - (progress - 0.8) / 0.2), envelope)
 
-            # Main tone with slight detuning for warmth
-            main_wave = 0.7 * math.sin(frequency * 2 * math.pi * t)
-            detune_wave = 0.3 * math.sin(frequency * 1.003 * 2 * math.pi * t)
+        wave = engine_sound * envelope
 
-            # Gentle envelope
-            envelope = math.exp(-t * 8) * (1 - math.exp(-t * 30))
+        # Stereo width with engine pan
+        left_engine, right_engine = synth.pan(wave, t, 7, 0.05)
 
-            wave = envelope * (main_wave + detune_wave)
+        return synth.to_stereo(left_engine, right_engine, 3000)
 
-            wave_value = 2500
-            arr.append([int(wave_value * wave), int(wave_value * wave)])
+    def render_tone(self, synth, frequency, duration):
+        t = synth.time_vector(duration)
 
-        sound_array = np.array(arr, dtype=np.int16)
-        sound = pygame.sndarray.make_sound(sound_array)
-        return sound
+        # Clean menu selection tone with subtle character
 
-    def create_simple_tone(self, frequency, duration):
-        sample_rate = 44100
-        frames = int(duration * sample_rate)
-        arr = []
-        for i in range(frames):
-            wave = 2000 * math.sin(frequency * 2 * math.pi * i / sample_rate)
-            arr.append([int(wave), int(wave)])
-        sound_array = np.array(arr, dtype=np.int16)
-        sound = pygame.sndarray.make_sound(sound_array)
-        return sound
+        # Main tone with slight detuning for warmth
+        main_wave = 0.7 * synth.sine(frequency, t)
+        detune_wave = 0.3 * synth.sine(frequency * 1.003, t)
 
-    def create_tone_sweep(self, start_freq, end_freq, duration):
-        sample_rate = 44100
-        frames = int(duration * sample_rate)
-        arr = []
+        # Gentle envelope
+        envelope = synth.attack_decay(t, 8, 30)
 
-        for i in range(frames):
-            t = i / sample_rate
-            progress = t / duration
+        wave = envelope * (main_wave + detune_wave)
 
-            # Smooth frequency sweep for menu confirm
-            freq = start_freq + (end_freq - start_freq) * (progress ** 0.7)  # Curved sweep
+        return synth.to_stereo(wave, wave, 2500)
 
-            # Main tone with harmonic
-            main_wave = 0.7 * math.sin(freq * 2 * math.pi * t)
-            harmonic = 0.3 * math.sin(freq * 1.5 * 2 * math.pi * t)
+    def render_simple_tone(self, synth, frequency, duration):
+        wave = synth.sine(frequency, synth.time_vector(duration))
+        return synth.to_stereo(wave, wave, 2000)
 
-            # Envelope with smooth attack and decay
-            envelope = math.sin(progress * math.pi) * math.exp(-progress * 2)
+    def render_tone_sweep(self, synth, start_freq, end_freq, duration):
+        t = synth.time_vector(duration)
+        progress = t / duration
 
-            # Slight vibrato for warmth
-            vibrato = 1 + 0.05 * math.sin(8 * 2 * math.pi * t)
+        # Smooth frequency sweep for menu confirm
+        freq = start_freq + (end_freq - start_freq) * (progress ** 0.7)  # Curved sweep
 
-            wave = envelope * (main_wave + harmonic) * vibrato
+        # Main tone with harmonic
+        main_wave = 0.7 * synth.sine(freq, t)
+        harmonic = 0.3 * synth.sine(freq * 1.5, t)
 
-            wave_value = 2800
-            arr.append([int(wave_value * wave), int(wave_value * wave)])
+        # Envelope with smooth attack and decay
+        envelope = np.sin(progress * np.pi) * np.exp(-progress * 2)
 
-        sound_array = np.array(arr, dtype=np.int16)
-        sound = pygame.sndarray.make_sound(sound_array)
-        return sound
+        # Slight vibrato for warmth
+        vibrato = 1 + 0.05 * synth.sine(8, t)
 
-    def create_shield_sound(self, duration):
-        sample_rate = 44100
-        frames = int(duration * sample_rate)
-        arr = []
+        wave = envelope * (main_wave + harmonic) * vibrato
 
-        for i in range(frames):
-            t = i / sample_rate
-            progress = t / duration
+        return synth.to_stereo(wave, wave, 2800)
 
-            # Sci-fi shield activation with multiple layers
+    def render_shield_sound(self, synth, duration):
+        t = synth.time_vector(duration)
+        progress = t / duration
 
-            # Power-up sweep
-            sweep_freq = 200 + 800 * progress
-            sweep_wave = 0.4 * math.sin(sweep_freq * 2 * math.pi * t)
+        # Sci-fi shield activation with multiple layers
 
-            # Energy crackling
-            crackle_intensity = math.exp(-t * 3)
-            crackle = 0.2 * crackle_intensity * random.uniform(-1, 1)
+        # Power-up sweep
+        sweep_freq = 200 + 800 * progress
+        sweep_wave = 0.4 * synth.sine(sweep_freq, t)
 
-            # Harmonic resonance
-            harmonic1 = 0.3 * math.sin(400 * 2 * math.pi * t)
-            harmonic2 = 0.2 * math.sin(600 * 2 * math.pi * t)
+        # Energy crackling
+        crackle = 0.2 * synth.decay(t, 3) * synth.noise(len(t))
 
-            # Modulation for sci-fi effect
-            modulation = 1 + 0.3 * math.sin(25 * 2 * math.pi * t)
+        # Harmonic resonance
+        harmonic1 = 0.3 * synth.sine(400, t)
+        harmonic2 = 0.2 * synth.sine(600, t)
 
-            envelope = math.exp(-t * 4) * (1 - math.exp(-t * 20))
-            wave = envelope * (sweep_wave + crackle + harmonic1 + harmonic2) * modulation
+        # Modulation for sci-fi effect
+        modulation = 1 + 0.3 * synth.sine(25, t)
 
-            wave_value = 3500
-            arr.append([int(wave_value * wave), int(wave_value * wave)])
+        envelope = synth.attack_decay(t, 4, 20)
+        wave = envelope * (sweep_wave + crackle + harmonic1 + harmonic2) * modulation
 
-        sound_array = np.array(arr, dtype=np.int16)
-        sound = pygame.sndarray.make_sound(sound_array)
-        return sound
+        return synth.to_stereo(wave, wave, 3500)
 
-    def create_coin_sound(self, duration):
-        sample_rate = 44100
-        frames = int(duration * sample_rate)
-        arr = []
+    def render_coin_sound(self, synth, duration):
+        t = synth.time_vector(duration)
 
-        for i in range(frames):
-            t = i / sample_rate
+        # Pleasant coin collection sound with multiple tones
 
-            # Pleasant coin collection sound with multiple tones
+        # Main bell-like tone
+        main_freq = 880
+        main_wave = 0.5 * synth.sine(main_freq, t)
 
-            # Main bell-like tone
-            main_freq = 880
-            main_wave = 0.5 * math.sin(main_freq * 2 * math.pi * t)
+        # Harmonic overtones for richness
+        overtone1 = 0.3 * synth.sine(main_freq * 1.5, t)
+        overtone2 = 0.2 * synth.sine(main_freq * 2, t)
+        overtone3 = 0.1 * synth.sine(main_freq * 3, t)
 
-            # Harmonic overtones for richness
-            overtone1 = 0.3 * math.sin(main_freq * 1.5 * 2 * math.pi * t)
-            overtone2 = 0.2 * math.sin(main_freq * 2 * 2 * math.pi * t)
-            overtone3 = 0.1 * math.sin(main_freq * 3 * 2 * math.pi * t)
+        # Quick bright sparkle at the beginning
+        sparkle_freq = 1760 + 500 * np.sin(t * 60)
+        sparkle = 0.2 * synth.decay(t, 25) * synth.sine(sparkle_freq, t)
 
-            # Quick bright sparkle at the beginning
-            sparkle_freq = 1760 + 500 * math.sin(t * 60)
-            sparkle_envelope = math.exp(-t * 25)
-            sparkle = 0.2 * sparkle_envelope * math.sin(sparkle_freq * 2 * math.pi * t)
+        # Main envelope with natural decay
+        envelope = synth.attack_decay(t, 12, 50)
 
-            # Main envelope with natural decay
-            envelope = math.exp(-t * 12) * (1 - math.exp(-t * 50))
+        wave = envelope * (main_wave + overtone1 + overtone2 + overtone3 + sparkle)
 
-            wave = envelope * (main_wave + overtone1 + overtone2 + overtone3 + sparkle)
+        return synth.to_stereo(wave, wave, 3000)
 
-            wave_value = 3000
-            arr.append([int(wave_value * wave), int(wave_value * wave)])
+    def render_powerup_sound(self, synth, duration):
+        t = synth.time_vector(duration)
+        progress = t / duration
 
-        sound_array = np.array(arr, dtype=np.int16)
-        sound = pygame.sndarray.make_sound(sound_array)
-        return sound
+        # Epic power-up sound with rising energy
 
-    def create_powerup_sound(self, duration):
-        sample_rate = 44100
-        frames = int(duration * sample_rate)
-        arr = []
+        # Main rising sweep
+        sweep_freq = 220 * (2 ** (progress * 2.5))  # More dramatic rise
+        main_wave = 0.6 * synth.sine(sweep_freq, t)
 
-        for i in range(frames):
-            t = i / sample_rate
-            progress = t / duration
+        # Harmonic layers for richness
+        harmonic1 = 0.3 * synth.sine(sweep_freq * 1.5, t)
+        harmonic2 = 0.2 * synth.sine(sweep_freq * 2, t)
 
-            # Epic power-up sound with rising energy
+        # Energy burst at the end
+        burst_intensity = np.clip((progress - 0.7) / 0.3, 0, None)
+        main_wave = main_wave + 0.4 * burst_intensity * synth.sine(1760, t)
 
-            # Main rising sweep
-            sweep_freq = 220 * (2 ** (progress * 2.5))  # More dramatic rise
-            main_wave = 0.6 * math.sin(sweep_freq * 2 * math.pi * t)
+        # Modulation for sci-fi character
+        modulation = 1 + 0.2 * synth.sine(15, t)
 
-            # Harmonic layers for richness
-            harmonic1 = 0.3 * math.sin(sweep_freq * 1.5 * 2 * math.pi * t)
-            harmonic2 = 0.2 * math.sin(sweep_freq * 2 * 2 * math.pi * t)
+        # Dynamic envelope
+        envelope = (1 - progress * 0.3) * (1 - synth.decay(t, 8))
+        # Final crescendo
+        envelope = np.where(progress > 0.8, envelope * (1 + (progress - 0.8) * 2), envelope)
 
-            # Energy burst at the end
-            if progress > 0.7:
-                burst_intensity = (progress - 0.7) / 0.3
-                energy_burst = 0.4 * burst_intensity * math.sin(1760 * 2 * math.pi * t)
-                main_wave += energy_burst
+        wave = envelope * (main_wave + harmonic1 + harmonic2) * modulation
 
-            # Modulation for sci-fi character
-            modulation = 1 + 0.2 * math.sin(15 * 2 * math.pi * t)
+        return synth.to_stereo(wave, wave, 3500)
 
-            # Dynamic envelope
-            envelope = (1 - progress * 0.3) * (1 - math.exp(-t * 8))
-            if progress > 0.8:  # Final crescendo
-                envelope *= 1 + (progress - 0.8) * 2
+    def render_music_block(self, synth, start_frame, frames, ambient_state=0.0, duration=None):
+        t = (start_frame + np.arange(frames)) / synth.sample_rate
 
-            wave = envelope * (main_wave + harmonic1 + harmonic2) * modulation
+        # Current chord (changes every 5.625 seconds)
+        chord_index = (t / MUSIC_CHORD_LENGTH).astype(int) % len(MUSIC_CHORDS)
+        chord_notes = MUSIC_CHORDS[chord_index]
+        bass_notes = MUSIC_BASS[chord_index]
 
-            wave_value = 3500
-            arr.append([int(wave_value * wave), int(wave_value * wave)])
+        # Bass line with subtle movement
+        bass_envelope = 0.4 * (1 + 0.2 * np.sin(t * 0.3))
+        wave = np.zeros(frames)
+        for note in range(bass_notes.shape[1]):
+            bass_freq = bass_notes[:, note]
+            wave += bass_envelope * synth.sine(bass_freq, t)
+            wave += 0.1 * synth.sine(bass_freq * 2, t)  # Octave harmonic
 
-        sound_array = np.array(arr, dtype=np.int16)
-        sound = pygame.sndarray.make_sound(sound_array)
-        return sound
+        # Main chord pad with gentle tremolo
+        pad_envelope = 0.25 * (1 + 0.15 * np.sin(t * 0.8))
+        for note in range(chord_notes.shape[1]):
+            freq = chord_notes[:, note]
+            # Main tone plus slight detuning for warmth
+            wave += pad_envelope * synth.sine(freq, t)
+            wave += pad_envelope * 0.3 * synth.sine(freq * 1.002, t)
+
+        # Ethereal high melody in the second half of each section
+        melody_envelope = 0.15 * np.sin((t % 11.25) / 11.25 * np.pi)
+        # Octave above the root, alternating with the third on odd chords
+        melody_freq = np.where(chord_index % 2 == 1, chord_notes[:, 1], chord_notes[:, 0]) * 2
+        # Add subtle vibrato
+        vibrato = 1 + 0.05 * synth.sine(6, t)
+        melody_wave = melody_envelope * synth.sine(melody_freq, t) * vibrato
+        wave += np.where((t % 22.5) > 11.25, melody_wave, 0)
+
+        # Ambient space texture with filtered noise, starting after 10 seconds
+        ambient_intensity = 0.05 * (1 + 0.5 * np.sin(t * 0.1))
+        ambient_noise = np.where(t > 10, ambient_intensity * synth.noise(frames), 0)
+        # One-pole low-pass (0.7 * new + 0.3 * previous) carried across blocks
+        ambient = np.convolve(ambient_noise, AMBIENT_FILTER_TAPS)[:frames]
+        ambient += ambient_state * 0.3 ** np.arange(1, frames + 1)
+        wave += ambient
+        ambient_state = ambient[-1] if frames else ambient_state
+
+        # Subtle arpeggiation effect
+        arp_time = (t * 2) % 1
+        arp_note = chord_notes[np.arange(frames), ((t * 2) % chord_notes.shape[1]).astype(int)]
+        arp_wave = 0.1 * synth.decay(arp_time, 20) * synth.sine(arp_note * 4, t)
+        wave += np.where(arp_time < 0.1, arp_wave, 0)  # Brief arp notes
+
+        # Fade in at the start, and out at the end of a fixed-length loop
+        loop_envelope = np.minimum(1.0, t / 2)
+        if duration is not None:
+            loop_envelope = np.minimum(loop_envelope, (duration - t) / 2)
+        wave *= loop_envelope
+
+        # Stereo width with subtle panning
+        left_pan, right_pan = synth.pan(wave, t, 0.7, 0.05)
+
+        # Lower volume for background music
+        return synth.to_stereo(left_pan, right_pan, 1200), ambient_state
+
+    def music_blocks(self, synth, block_frames, duration=None):
+        # Yields the chord progression in blocks; runs forever without a duration
+        total_frames = None if duration is None else int(duration * synth.sample_rate)
+        start_frame = 0
+        ambient_state = 0.0
+        while total_frames is None or start_frame < total_frames:
+            frames = block_frames
+            if total_frames is not None:
+                frames = min(frames, total_frames - start_frame)
+            block, ambient_state = self.render_music_block(synth, start_frame, frames, ambient_state, duration)
+            yield block
+            start_frame += frames
+
+    def render_background_music(self, synth, duration):
+        blocks = self.music_blocks(synth, SAMPLE_RATE, duration)
+        return np.concatenate(list(blocks))
 
     def create_background_music(self):
-        sample_rate = 44100
-        duration = 45  # Longer loop for more variety
-        frames = int(duration * sample_rate)
-        arr = []
-
-        # Extended chord progression in A minor with more sophisticated harmony
-        chord_progression = [
-            ([220, 262, 330], [110, 165]),    # A minor + bass
-            ([294, 349, 440], [147, 220]),    # D minor + bass
-            ([262, 311, 392], [131, 196]),    # C major + bass
-            ([349, 415, 523], [174, 261]),    # F major + bass
-            ([247, 294, 370], [123, 185]),    # B diminished + bass
-            ([330, 392, 494], [165, 247]),    # E minor + bass
-            ([294, 370, 440], [147, 220]),    # D minor + bass
-            ([220, 277, 330], [110, 165]),    # A minor + bass
-        ]
-
-        for i in range(frames):
-            t = i / sample_rate
-
-            # Current chord (changes every 5.625 seconds)
-            chord_index = int(t / 5.625) % len(chord_progression)
-            chord_notes, bass_notes = chord_progression[chord_index]
-
-            wave = 0
-
-            # Bass line with subtle movement
-            bass_envelope = 0.4 * (1 + 0.2 * math.sin(t * 0.3))
-            for bass_freq in bass_notes:
-                bass_wave = bass_envelope * math.sin(bass_freq * 2 * math.pi * t)
-                bass_wave += 0.1 * math.sin(bass_freq * 2 * 2 * math.pi * t)  # Octave harmonic
-                wave += bass_wave
-
-            # Main chord pad with gentle tremolo
-            pad_envelope = 0.25 * (1 + 0.15 * math.sin(t * 0.8))
-            for freq in chord_notes:
-                # Main tone
-                pad_wave = pad_envelope * math.sin(freq * 2 * math.pi * t)
-                # Add slight detuning for warmth
-                pad_wave += pad_envelope * 0.3 * math.sin(freq * 1.002 * 2 * math.pi * t)
-                wave += pad_wave
-
-            # Ethereal high melody that appears periodically
-            if (t % 22.5) > 11.25:  # Play melody in second half of each section
-                melody_envelope = 0.15 * math.sin((t % 11.25) / 11.25 * math.pi)
-                melody_freq = chord_notes[0] * 2  # Octave above root
-                if chord_index % 2 == 1:  # Alternate melody notes
-                    melody_freq = chord_notes[1] * 2
-                melody_wave = melody_envelope * math.sin(melody_freq * 2 * math.pi * t)
-                # Add subtle vibrato
-                vibrato = 1 + 0.05 * math.sin(6 * 2 * math.pi * t)
-                melody_wave *= vibrato
-                wave += melody_wave
-
-            # Ambient space texture with filtered noise
-            if t > 10:  # Start ambient texture after 10 seconds
-                ambient_intensity = 0.05 * (1 + 0.5 * math.sin(t * 0.1))
-                ambient_noise = ambient_intensity * random.uniform(-1, 1)
-                # Apply simple low-pass filter effect
-                if i > 0:
-                    ambient_noise = 0.7 * ambient_noise + 0.3 * previous_ambient
-                wave += ambient_noise
-                previous_ambient = ambient_noise
-            else:
-                previous_ambient = 0
-
-            # Subtle arpeggiation effect
-            arp_time = (t * 2) % 1
-            if arp_time < 0.1:  # Brief arp notes
-                arp_note = chord_notes[int((t * 2) % len(chord_notes))]
-                arp_envelope = 0.1 * math.exp(-arp_time * 20)
-                arp_wave = arp_envelope * math.sin(arp_note * 4 * 2 * math.pi * t)
-                wave += arp_wave
-
-            # Overall envelope for smooth looping
-            loop_envelope = 1.0
-            if t < 2:  # Fade in
-                loop_envelope = t / 2
-            elif t > duration - 2:  # Fade out
-                loop_envelope = (duration - t) / 2
-
-            wave *= loop_envelope
-
-            # Stereo width with subtle panning
-            left_pan = 0.95 + 0.05 * math.sin(t * 0.7)
-            right_pan = 0.95 - 0.05 * math.sin(t * 0.7)
-
-            wave_value = 1200  # Lower volume for background music
-            arr.append([int(wave_value * wave * left_pan), int(wave_value * wave * right_pan)])
-
-        sound_array = np.array(arr, dtype=np.int16)
-        return pygame.sndarray.make_sound(sound_array)
+        return self.build_sound('background_music', self.render_background_music, MUSIC_LOOP_DURATION)
 
     def start_background_music(self):
         if self.music_enabled:
             try:
+                if self.music_streaming:
+                    if not self.music_stream:
+                        block_frames = int(MUSIC_BLOCK_DURATION * SAMPLE_RATE)
+                        music_synth = self.create_synth('music_stream', ())
+                        self.music_stream = MusicStream(self.music_blocks(music_synth, block_frames))
+                    self.music_stream.start(self.music_volume)
+                    return
                 if not self.background_music:
                     self.background_music = self.create_background_music()
                 self.background_music.set_volume(self.music_volume)
@@ -579,14 +892,24 @@ class SoundManager:
                 pass
 
     def stop_background_music(self):
+        if self.music_stream:
+            self.music_stream.stop()
+            self.music_stream = None
         if self.background_music:
             self.background_music.stop()
 
     def set_music_volume(self, volume):
         self.music_volume = max(0, min(1, volume))
+        if self.music_stream:
+            self.music_stream.set_volume(self.music_volume)
         if self.background_music:
             self.background_music.set_volume(self.music_volume)
 
+    def update(self):
+        # Called once per frame to keep the streaming music channel fed
+        if self.music_stream:
+            self.music_stream.update()
+
     def set_sfx_volume(self, volume):
         self.sfx_volume = max(0, min(1, volume))
 
@@ -601,70 +924,354 @@ class SoundManager:
         self.sfx_enabled = not self.sfx_enabled
 
     def play(self, sound_name):
-        if self.sfx_enabled and sound_name in self.sounds:
+        if self.sfx_enabled and sound_name in self.effects:
             try:
-                sound = self.sounds[sound_name]
+                sound = self.sounds.get(sound_name)
+                if sound is None:
+                    future = self.warm_up_futures.get(sound_name)
+                    if future is not None and not future.done():
+                        return  # Still warming up; skip it rather than stall the frame
+                    sound = self.load_sound(sound_name)
                 sound.set_volume(self.sfx_volume)
                 sound.play()
             except:
                 pass
 
-class Particle:
-    def __init__(self, x, y, vel_x, vel_y, color=WHITE, life=30):
-        self.x = x
-        self.y = y
-        self.vel_x = vel_x
-        self.vel_y = vel_y
-        self.color = color
-        self.life = life
-        self.max_life = life
-        self.size = random.uniform(1, 4)  # Variable particle sizes
-        self.trail_positions = [(x, y)]  # Trail effect
+class NullSoundManager:
+    # Silent stand-in for SoundManager when there is no audio device
+    def play(self, sound_name):
+        pass
 
     def update(self):
-        self.x += self.vel_x
-        self.y += self.vel_y
-        self.life -= 1
-        self.vel_x *= 0.98
-        self.vel_y *= 0.98
+        pass
 
-        # Screen wrapping for particles
-        self.x = self.x % WIDTH
-        self.y = self.y % HEIGHT
+def interpolate(previous, current, alpha, wrap=None):
+    # Render position between the last two simulation steps. Objects that
+    # wrapped around the screen during the step snap to their new position.
+    delta = current - previous
+    if wrap is not None and abs(delta) > wrap / 2:
+        return current
+    return previous + delta * alpha
+
+PARTICLE_TRAIL_LENGTH = 5
+GLOW_BRIGHTNESS_BANDS = 16
+
+class GlowSpriteAtlas:
+    # Small pre-rendered dots keyed by palette colour, radius, brightness band
+    # and bright-centre radius. A whole frame of particles becomes one
+    # Surface.blits call with additive blending instead of several
+    # pygame.draw.circle calls per particle.
+    def __init__(self, bands=GLOW_BRIGHTNESS_BANDS):
+        self.bands = bands
+        self.sprites = {}
+
+    def pack(self, colors, radius, band, center_radius):
+        # One integer per sprite so a frame's sprites can be deduplicated with np.unique
+        return ((np.asarray(colors) * 8 + radius) * (self.bands + 1) + band) * 8 + center_radius
+
+    def unpack(self, sprite_id):
+        sprite_id, center_radius = divmod(sprite_id, 8)
+        sprite_id, band = divmod(sprite_id, self.bands + 1)
+        color, radius = divmod(sprite_id, 8)
+        return color, radius, band, center_radius
+
+    def render(self, color, radius, band, center_radius):
+        brightness = band / self.bands
+        main_color = tuple(int(c * brightness) for c in color)
+        sprite = pygame.Surface((radius * 2, radius * 2))
+        sprite.fill(BLACK)
+        pygame.draw.circle(sprite, main_color, (radius, radius), radius)
+        if center_radius:
+            center_color = tuple(min(255, int(c * 1.5)) for c in main_color)
+            pygame.draw.circle(sprite, center_color, (radius, radius), center_radius)
+        return sprite
+
+    def blit(self, screen, palette, sprite_ids, positions):
+        for sprite_id in np.unique(sprite_ids).tolist():
+            if sprite_id not in self.sprites:
+                color, radius, band, center_radius = self.unpack(sprite_id)
+                self.sprites[sprite_id] = self.render(palette[color], radius, band, center_radius)
+        # Sprites are centred on the particle, so offset them by their radius
+        radius = sprite_ids // 8 // (self.bands + 1) % 8
+        destinations = (positions - radius[:, None]).tolist()
+        sprites = map(self.sprites.__getitem__, sprite_ids.tolist())
+        screen.blits(zip(sprites, destinations, itertools.repeat(None), itertools.repeat(pygame.BLEND_ADD)),
+                     doreturn=False)
+
+class ParticleSystem:
+    # Structure-of-arrays particle storage. Every particle lives in a slot of
+    # preallocated NumPy arrays; update() moves all of them in one vectorized
+    # step and dead slots are compacted away instead of deleted one by one.
+    # Trails share a single ring-buffer head, so recording them is one write.
+    # With a budget, emitting into a full system first evicts the particles
+    # closest to fading out (lowest life/max_life); budget_hits counts the
+    # emits that had to.
+    def __init__(self, capacity=1024, trail_length=PARTICLE_TRAIL_LENGTH, seed=None, budget=None):
+        self.count = 0
+        self.budget = budget
+        self.budget_hits = 0
+        self.trail_length = trail_length
+        self.trail_head = 0
+        self.rng = np.random.default_rng(seed)
+        # Colours are stored as indices into a palette that grows on demand
+        self.palette = []
+        self.palette_lookup = {}
+        self.atlas = GlowSpriteAtlas()
+        self.allocate(capacity)
+
+    def allocate(self, capacity):
+        count = self.count
+        fields = {
+            'x': np.zeros(capacity),
+            'y': np.zeros(capacity),
+            'prev_x': np.zeros(capacity),
+            'prev_y': np.zeros(capacity),
+            'vel_x': np.zeros(capacity),
+            'vel_y': np.zeros(capacity),
+            'life': np.zeros(capacity),
+            'max_life': np.ones(capacity),
+            'size': np.zeros(capacity),
+            'color': np.zeros(capacity, dtype=np.int32),
+            'trail': np.zeros((capacity, self.trail_length, 2)),
+            'trail_count': np.zeros(capacity, dtype=np.int32),
+        }
+        for name, array in fields.items():
+            if count:
+                array[:count] = getattr(self, name)[:count]
+            setattr(self, name, array)
+        self.capacity = capacity
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    def color_index(self, color):
+        index = self.palette_lookup.get(color)
+        if index is None:
+            index = len(self.palette)
+            self.palette.append(color)
+            self.palette_lookup[color] = index
+        return index
+
+    def emit(self, x, y, vel_x, vel_y, colors, lives):
+        # Positions may be scalars (one emitter) or arrays; velocities,
+        # colours and lives are one entry per new particle
+        vel_x = np.asarray(vel_x, dtype=float)
+        n = len(vel_x)
+        if n == 0:
+            return
+        if self.budget is not None and self.count + n > self.budget:
+            self.budget_hits += 1
+            if n > self.budget:
+                # A burst bigger than the whole budget keeps only its newest part
+                keep = slice(n - self.budget, None)
+                x, y = np.broadcast_to(x, n)[keep], np.broadcast_to(y, n)[keep]
+                vel_x, vel_y = vel_x[keep], np.asarray(vel_y, dtype=float)[keep]
+                colors, lives = list(colors)[keep], np.broadcast_to(lives, n)[keep]
+                n = self.budget
+            self.evict(self.count + n - self.budget)
+        if self.count + n > self.capacity:
+            self.allocate(max(self.capacity * 2, self.count + n))
+        new = slice(self.count, self.count + n)
+        self.x[new] = x
+        self.y[new] = y
+        self.prev_x[new] = x
+        self.prev_y[new] = y
+        self.vel_x[new] = vel_x
+        self.vel_y[new] = vel_y
+        self.life[new] = lives
+        self.max_life[new] = lives
+        self.size[new] = self.rng.uniform(1, 4, n)  # Variable particle sizes
+        self.color[new] = [self.color_index(color) for color in colors]
+        self.trail[new, self.trail_head, 0] = self.x[new]
+        self.trail[new, self.trail_head, 1] = self.y[new]
+        self.trail_count[new] = 1
+        self.count += n
 
-        # Update trail
-        self.trail_positions.append((self.x, self.y))
-        if len(self.trail_positions) > 5:  # Keep last 5 positions
-            self.trail_positions.pop(0)
+    def update(self):
+        n = self.count
+        if n == 0:
+            return
+        x, y = self.x[:n], self.y[:n]
+        self.prev_x[:n] = x
+        self.prev_y[:n] = y
+        x += self.vel_x[:n]
+        y += self.vel_y[:n]
+        self.life[:n] -= 1
+        self.vel_x[:n] *= 0.98
+        self.vel_y[:n] *= 0.98
 
-    def draw(self, screen):
-        if self.life > 0:
-            life_ratio = self.life / self.max_life
+        # Screen wrapping for particles
+        np.mod(x, WIDTH, out=x)
+        np.mod(y, HEIGHT, out=y)
+
+        # Update trail, keeping the last trail_length positions
+        self.trail_head = (self.trail_head + 1) % self.trail_length
+        self.trail[:n, self.trail_head, 0] = x
+        self.trail[:n, self.trail_head, 1] = y
+        np.minimum(self.trail_count[:n] + 1, self.trail_length, out=self.trail_count[:n])
+
+        self.compact()
+
+    def evict(self, k):
+        # Kills the k particles with the least life left and compacts them away
+        n = self.count
+        if k >= n:
+            self.count = 0
+            return
+        faded = np.argpartition(self.life[:n] / self.max_life[:n], k - 1)[:k]
+        self.life[faded] = 0
+        self.compact()
+
+    def compact(self):
+        n = self.count
+        alive = self.life[:n] > 0
+        if alive.all():
+            return
+        keep = np.flatnonzero(alive)
+        for array in (self.x, self.y, self.prev_x, self.prev_y, self.vel_x, self.vel_y, self.life, self.max_life,
+                      self.size, self.color, self.trail, self.trail_count):
+            array[:len(keep)] = array[keep]
+        self.count = len(keep)
+
+    def trail_points(self):
+        # Trail slots ordered oldest to newest, shape (count, trail_length)
+        offsets = np.arange(self.trail_length) - self.trail_length + 1
+        return (self.trail_head + offsets) % self.trail_length
+
+    def render_positions(self, alpha):
+        n = self.count
+        positions = []
+        for previous, current, wrap in ((self.prev_x[:n], self.x[:n], WIDTH), (self.prev_y[:n], self.y[:n], HEIGHT)):
+            delta = current - previous
+            positions.append(np.where(np.abs(delta) > wrap / 2, current, previous + delta * alpha))
+        return np.stack(positions, axis=1)
+
+    def draw(self, screen, alpha=1.0, now=None):
+        n = self.count
+        if n == 0:
+            return
+        if now is None:
+            now = time.time()
+        bands = self.atlas.bands
+        life_ratio = self.life[:n] / self.max_life[:n]
+        sizes = self.size[:n]
+        colors = self.color[:n]
+
+        # Main particle with pulsing effect, plus a bright center for some
+        pulse = 0.8 + 0.2 * math.sin(now * 10)
+        main_band = (life_ratio * pulse * bands).astype(int)
+        main_radius = sizes.astype(int)
+        center_radius = np.where((life_ratio > 0.5) & (sizes > 2), np.maximum(1, (sizes * 0.4).astype(int)), 0)
+
+        # Trail effect: every recorded position except the newest, fading in
+        # from the oldest one; lower quality levels leave out the oldest ones
+        skip = self.trail_length - min(quality.settings.particle_trail, self.trail_length)
+        slots = self.trail_points()[skip:-1]
+        counts = self.trail_count[:n, None]
+        age = np.arange(skip, self.trail_length - 1) - (self.trail_length - counts)
+        trail_alpha = life_ratio[:, None] * (age / counts) * 0.5
+        trail_band = np.where(age >= 0, (trail_alpha * bands).astype(int), 0)
+        trail_radius = np.broadcast_to(np.maximum(1, (sizes * 0.5).astype(int))[:, None], trail_band.shape)
+        visible = trail_band > 0
+
+        sprite_ids = np.concatenate((
+            self.atlas.pack(colors, main_radius, main_band, center_radius),
+            self.atlas.pack(np.broadcast_to(colors[:, None], trail_band.shape)[visible],
+                            trail_radius[visible], trail_band[visible], 0),
+        ))
+        positions = np.concatenate((
+            self.render_positions(alpha),
+            self.trail[:n][:, slots][visible],
+        )).astype(int)
+        self.atlas.blit(screen, self.palette, sprite_ids, positions)
+
+# Hull outline and colour per ship skin, in ship space (nose along +x)
+SHIP_SKINS = {
+    'default': ([(-10, -8), (15, 0), (-10, 8), (-5, 0)], WHITE),
+    'astro': ([(-8, -10), (20, 0), (-8, 10), (-3, 8), (-3, -8)], BLUE),
+    'fighter': ([(-12, -6), (18, 0), (-12, 6), (-8, 4), (-8, -4)], RED),
+    'stealth': ([(-5, -15), (18, -2), (14, 0), (18, 2), (-5, 15), (-8, 8), (-12, 0), (-8, -8)], (80, 80, 120)),
+    'classic': ([(-8, -12), (16, 0), (-8, 12), (-4, 0)], GREEN),
+}
+SHIP_SPRITE_HALF = 24  # Sprites are 48x48 and centred on the ship
+SHIELD_PULSE_STEPS = 32
+
+class ShipSpriteCache:
+    # Each skin is rendered once per whole-degree heading (the ship only ever
+    # turns in whole degrees) the first time it is needed, and the shield rings
+    # once per quantized pulse level, so drawing the ship is a blit or two.
+    def __init__(self):
+        self.ships = {}
+        self.shields = {}
+
+    def ship(self, skin, angle):
+        key = (skin if skin in SHIP_SKINS else 'default', int(round(angle)) % 360)
+        sprite = self.ships.get(key)
+        if sprite is None:
+            sprite = self.ships[key] = self.render_ship(*key)
+        return sprite
+
+    def shield(self, pulse):
+        step = int(round(pulse * SHIELD_PULSE_STEPS))
+        sprite = self.shields.get(step)
+        if sprite is None:
+            sprite = self.shields[step] = self.render_shield(step / SHIELD_PULSE_STEPS)
+        return sprite
+
+    def render_ship(self, skin, angle):
+        sprite = pygame.Surface((SHIP_SPRITE_HALF * 2, SHIP_SPRITE_HALF * 2), pygame.SRCALPHA)
+        cos_angle = math.cos(math.radians(angle))
+        sin_angle = math.sin(math.radians(angle))
+
+        def rotate(points):
+            return [(SHIP_SPRITE_HALF + x * cos_angle - y * sin_angle,
+                     SHIP_SPRITE_HALF + x * sin_angle + y * cos_angle) for x, y in points]
+
+        ship_points, color = SHIP_SKINS[skin]
+        pygame.draw.polygon(sprite, color, rotate(ship_points))
+
+        if skin == 'astro':
+            center_x, center_y = rotate([(5, 0)])[0]
+            pygame.draw.circle(sprite, YELLOW, (int(center_x), int(center_y)), 3)
+        elif skin == 'fighter':
+            wing_points = [(-8, -10), (-4, -8), (-8, -6)]
+            wing_points2 = [(-8, 6), (-4, 8), (-8, 10)]
+            for wing in [wing_points, wing_points2]:
+                pygame.draw.polygon(sprite, YELLOW, rotate(wing))
+        elif skin == 'stealth':
+            # Add stealth details - angular lines
+            detail_points = [(-2, -8), (8, -4), (8, 4), (-2, 8)]
+            pygame.draw.polygon(sprite, (40, 40, 60), rotate(detail_points))
+        return sprite
+
+    def render_shield(self, shield_pulse):
+        sprite = pygame.Surface((SHIP_SPRITE_HALF * 2, SHIP_SPRITE_HALF * 2), pygame.SRCALPHA)
+        center = (SHIP_SPRITE_HALF, SHIP_SPRITE_HALF)
 
-            # Draw trail effect
-            for i, (trail_x, trail_y) in enumerate(self.trail_positions[:-1]):
-                trail_alpha = life_ratio * (i / len(self.trail_positions)) * 0.5
-                trail_color = tuple(int(c * trail_alpha) for c in self.color)
-                if sum(trail_color) > 0:  # Only draw if visible
-                    pygame.draw.circle(screen, trail_color, (int(trail_x), int(trail_y)), max(1, int(self.size * 0.5)))
+        # Outer shield ring
+        outer_color = tuple(int(c * shield_pulse) for c in CYAN)
+        pygame.draw.circle(sprite, outer_color, center, 22, 3)
 
-            # Main particle with pulsing effect
-            pulse = 0.8 + 0.2 * math.sin(time.time() * 10)
-            main_color = tuple(int(c * life_ratio * pulse) for c in self.color)
+        # Middle shield ring
+        mid_color = tuple(int(c * shield_pulse * 0.8) for c in ELECTRIC_BLUE)
+        pygame.draw.circle(sprite, mid_color, center, 20, 2)
 
-            # Draw main particle
-            pygame.draw.circle(screen, main_color, (int(self.x), int(self.y)), int(self.size))
+        # Inner shield sparkle
+        inner_color = tuple(int(c * shield_pulse * 0.6) for c in WHITE)
+        pygame.draw.circle(sprite, inner_color, center, 18, 1)
+        return sprite
 
-            # Add bright center for some particles
-            if life_ratio > 0.5 and self.size > 2:
-                center_color = tuple(min(255, int(c * 1.5)) for c in main_color)
-                pygame.draw.circle(screen, center_color, (int(self.x), int(self.y)), max(1, int(self.size * 0.4)))
+ship_sprites = ShipSpriteCache()
 
 class Player:
     def __init__(self, x, y):
         self.x = x
         self.y = y
         self.angle = 0
+        self.prev_x, self.prev_y, self.prev_angle = x, y, 0
         self.vel_x = 0
         self.vel_y = 0
         self.size = 10
@@ -678,24 +1285,24 @@ class Player:
         self.shield_time = 0
         self.rapid_fire_cooldown = 0
 
-    def update(self, sound_manager, speed_boost_level=0):
-        keys = pygame.key.get_pressed()
+    def update(self, controls, sound_manager, speed_boost_level=0):
+        self.prev_x, self.prev_y, self.prev_angle = self.x, self.y, self.angle
         self.thrusting = False
 
         rotation_speed = 5 + speed_boost_level
-        if keys[pygame.K_LEFT]:
+        if controls.rotate_left:
             self.angle -= rotation_speed
-        if keys[pygame.K_RIGHT]:
+        if controls.rotate_right:
             self.angle += rotation_speed
 
-        if keys[pygame.K_UP]:
+        if controls.thrust:
             self.thrusting = True
             thrust_power = self.thrust + (speed_boost_level * 0.1)
             thrust_x = math.cos(math.radians(self.angle)) * thrust_power
             thrust_y = math.sin(math.radians(self.angle)) * thrust_power
             self.vel_x += thrust_x
             self.vel_y += thrust_y
-            if random.random() < 0.1:
+            if rng.audio.random() < 0.1:
                 sound_manager.play('thrust')
 
         max_speed = self.max_speed + (speed_boost_level * 2)
@@ -725,108 +1332,54 @@ class Player:
         if self.rapid_fire_cooldown > 0:
             self.rapid_fire_cooldown -= 1
 
-    def draw(self, screen, ship_skin='default'):
+    def draw(self, screen, ship_skin='default', alpha=1.0):
         if self.invulnerable_time > 0 and self.invulnerable_time % 10 < 5:
             return
 
-        points = []
-        if ship_skin == 'astro':
-            ship_points = [(-8, -10), (20, 0), (-8, 10), (-3, 8), (-3, -8)]
-            color = BLUE
-        elif ship_skin == 'fighter':
-            ship_points = [(-12, -6), (18, 0), (-12, 6), (-8, 4), (-8, -4)]
-            color = RED
-        elif ship_skin == 'stealth':
-            ship_points = [(-5, -15), (18, -2), (14, 0), (18, 2), (-5, 15), (-8, 8), (-12, 0), (-8, -8)]
-            color = (80, 80, 120)
-        elif ship_skin == 'classic':
-            ship_points = [(-8, -12), (16, 0), (-8, 12), (-4, 0)]
-            color = GREEN
-        else:
-            ship_points = [(-10, -8), (15, 0), (-10, 8), (-5, 0)]
-            color = WHITE
-
-        for point in ship_points:
-            rotated_x = point[0] * math.cos(math.radians(self.angle)) - point[1] * math.sin(math.radians(self.angle))
-            rotated_y = point[0] * math.sin(math.radians(self.angle)) + point[1] * math.cos(math.radians(self.angle))
-            points.append((self.x + rotated_x, self.y + rotated_y))
-
-        pygame.draw.polygon(screen, color, points)
-
-        if ship_skin == 'astro':
-            center_x = self.x + math.cos(math.radians(self.angle)) * 5
-            center_y = self.y + math.sin(math.radians(self.angle)) * 5
-            pygame.draw.circle(screen, YELLOW, (int(center_x), int(center_y)), 3)
-        elif ship_skin == 'fighter':
-            wing_points = [(-8, -10), (-4, -8), (-8, -6)]
-            wing_points2 = [(-8, 6), (-4, 8), (-8, 10)]
-            for wing in [wing_points, wing_points2]:
-                rotated_wing = []
-                for point in wing:
-                    rotated_x = point[0] * math.cos(math.radians(self.angle)) - point[1] * math.sin(math.radians(self.angle))
-                    rotated_y = point[0] * math.sin(math.radians(self.angle)) + point[1] * math.cos(math.radians(self.angle))
-                    rotated_wing.append((self.x + rotated_x, self.y + rotated_y))
-                pygame.draw.polygon(screen, YELLOW, rotated_wing)
-        elif ship_skin == 'stealth':
-            # Add stealth details - angular lines
-            detail_points = [(-2, -8), (8, -4), (8, 4), (-2, 8)]
-            rotated_details = []
-            for point in detail_points:
-                rotated_x = point[0] * math.cos(math.radians(self.angle)) - point[1] * math.sin(math.radians(self.angle))
-                rotated_y = point[0] * math.sin(math.radians(self.angle)) + point[1] * math.cos(math.radians(self.angle))
-                rotated_details.append((self.x + rotated_x, self.y + rotated_y))
-            pygame.draw.polygon(screen, (40, 40, 60), rotated_details)
+        x = interpolate(self.prev_x, self.x, alpha, WIDTH)
+        y = interpolate(self.prev_y, self.y, alpha, HEIGHT)
+        angle = interpolate(self.prev_angle, self.angle, alpha)
+        position = (int(x) - SHIP_SPRITE_HALF, int(y) - SHIP_SPRITE_HALF)
+        screen.blit(ship_sprites.ship(ship_skin, angle), position)
 
         if self.shield_active:
             # Pulsing shield effect with multiple colors
             shield_pulse = 0.7 + 0.3 * math.sin(time.time() * 8)
+            screen.blit(ship_sprites.shield(shield_pulse), position)
 
-            # Outer shield ring
-            outer_color = tuple(int(c * shield_pulse) for c in CYAN)
-            pygame.draw.circle(screen, outer_color, (int(self.x), int(self.y)), 22, 3)
-
-            # Middle shield ring
-            mid_color = tuple(int(c * shield_pulse * 0.8) for c in ELECTRIC_BLUE)
-            pygame.draw.circle(screen, mid_color, (int(self.x), int(self.y)), 20, 2)
-
-            # Inner shield sparkle
-            inner_color = tuple(int(c * shield_pulse * 0.6) for c in WHITE)
-            pygame.draw.circle(screen, inner_color, (int(self.x), int(self.y)), 18, 1)
-
-    def get_thrust_particles(self):
-        if self.thrusting:
-            particles = []
-            for _ in range(5):  # More particles
-                thrust_angle = self.angle + 180 + random.uniform(-40, 40)
-                vel_x = math.cos(math.radians(thrust_angle)) * random.uniform(3, 6)
-                vel_y = math.sin(math.radians(thrust_angle)) * random.uniform(3, 6)
-
-                # Colorful engine exhaust
-                thrust_colors = [
-                    YELLOW, ORANGE, BRIGHT_RED, WHITE,
-                    HOT_PINK, ELECTRIC_BLUE, GOLD, CRIMSON
-                ]
-                color = random.choice(thrust_colors)
-
-                particles.append(Particle(
-                    self.x - math.cos(math.radians(self.angle)) * 12,
-                    self.y - math.sin(math.radians(self.angle)) * 12,
-                    vel_x, vel_y, color, random.randint(15, 25)
-                ))
-
-            # Add some special blue core particles
-            for _ in range(2):
-                thrust_angle = self.angle + 180 + random.uniform(-20, 20)
-                vel_x = math.cos(math.radians(thrust_angle)) * random.uniform(2, 4)
-                vel_y = math.sin(math.radians(thrust_angle)) * random.uniform(2, 4)
-                particles.append(Particle(
-                    self.x - math.cos(math.radians(self.angle)) * 8,
-                    self.y - math.sin(math.radians(self.angle)) * 8,
-                    vel_x, vel_y, ELECTRIC_BLUE, 30
-                ))
-
-            return particles
-        return []
+    def emit_thrust_particles(self, particle_system):
+        if not self.thrusting:
+            return
+
+        # Colorful engine exhaust
+        thrust_colors = [
+            YELLOW, ORANGE, BRIGHT_RED, WHITE,
+            HOT_PINK, ELECTRIC_BLUE, GOLD, CRIMSON
+        ]
+        vel_x, vel_y, colors, lives = [], [], [], []
+        for _ in range(quality.scaled(5)):  # More particles
+            thrust_angle = self.angle + 180 + rng.visual.uniform(-40, 40)
+            vel_x.append(math.cos(math.radians(thrust_angle)) * rng.visual.uniform(3, 6))
+            vel_y.append(math.sin(math.radians(thrust_angle)) * rng.visual.uniform(3, 6))
+            colors.append(rng.visual.choice(thrust_colors))
+            lives.append(rng.visual.randint(15, 25))
+        particle_system.emit(
+            self.x - math.cos(math.radians(self.angle)) * 12,
+            self.y - math.sin(math.radians(self.angle)) * 12,
+            vel_x, vel_y, colors, lives
+        )
+
+        # Add some special blue core particles
+        vel_x, vel_y = [], []
+        for _ in range(quality.scaled(2)):
+            thrust_angle = self.angle + 180 + rng.visual.uniform(-20, 20)
+            vel_x.append(math.cos(math.radians(thrust_angle)) * rng.visual.uniform(2, 4))
+            vel_y.append(math.sin(math.radians(thrust_angle)) * rng.visual.uniform(2, 4))
+        particle_system.emit(
+            self.x - math.cos(math.radians(self.angle)) * 8,
+            self.y - math.sin(math.radians(self.angle)) * 8,
+            vel_x, vel_y, [ELECTRIC_BLUE] * len(vel_x), 30
+        )
 
     def reset_position(self):
         self.x = WIDTH // 2
@@ -834,28 +1387,63 @@ class Player:
         self.vel_x = 0
         self.vel_y = 0
         self.angle = 0
+        self.prev_x, self.prev_y, self.prev_angle = self.x, self.y, self.angle
         self.invulnerable_time = self.max_invulnerable_time
 
+BULLET_TRAIL_LENGTH = 8  # Longer trail than particles
+BULLET_POOL_SIZE = 256
+
 class Bullet:
+    # Spent bullets go back to a shared pool through release() and spawn()
+    # hands them out again, so firing does not allocate. The trail is a fixed
+    # ring of BULLET_TRAIL_LENGTH positions; trail_head is the next slot.
+    __slots__ = ('x', 'y', 'prev_x', 'prev_y', 'vel_x', 'vel_y', 'life', 'max_life',
+                 'trail_x', 'trail_y', 'trail_head', 'trail_count', 'color', 'pulse_offset')
+
+    # Colorful bullets
+    colors = [
+        CYAN, MAGENTA, YELLOW, NEON_GREEN,
+        HOT_PINK, ELECTRIC_BLUE, ORANGE, LIME,
+        GOLD, VIOLET, BRIGHT_RED, WHITE
+    ]
+    pool = []
+
     def __init__(self, x, y, angle):
+        self.trail_x = [0.0] * BULLET_TRAIL_LENGTH
+        self.trail_y = [0.0] * BULLET_TRAIL_LENGTH
+        self.reset(x, y, angle)
+
+    @classmethod
+    def spawn(cls, x, y, angle):
+        if cls.pool:
+            bullet = cls.pool.pop()
+            bullet.reset(x, y, angle)
+            return bullet
+        return cls(x, y, angle)
+
+    @classmethod
+    def release(cls, bullet):
+        if len(cls.pool) < BULLET_POOL_SIZE:
+            cls.pool.append(bullet)
+
+    def reset(self, x, y, angle):
         self.x = x
         self.y = y
+        self.prev_x = x
+        self.prev_y = y
         self.vel_x = math.cos(math.radians(angle)) * 10
         self.vel_y = math.sin(math.radians(angle)) * 10
         self.life = 60
         self.max_life = 60
-        self.trail_positions = [(x, y)]
-
-        # Colorful bullets
-        self.bullet_colors = [
-            CYAN, MAGENTA, YELLOW, NEON_GREEN,
-            HOT_PINK, ELECTRIC_BLUE, ORANGE, LIME,
-            GOLD, VIOLET, BRIGHT_RED, WHITE
-        ]
-        self.color = random.choice(self.bullet_colors)
-        self.pulse_offset = random.uniform(0, math.pi * 2)
+        self.trail_x[0] = x
+        self.trail_y[0] = y
+        self.trail_head = 1
+        self.trail_count = 1
+        self.color = rng.visual.choice(self.colors)
+        self.pulse_offset = rng.visual.uniform(0, math.pi * 2)
 
     def update(self):
+        self.prev_x, self.prev_y = self.x, self.y
         self.x += self.vel_x
         self.y += self.vel_y
         self.x = self.x % WIDTH
@@ -863,45 +1451,57 @@ class Bullet:
         self.life -= 1
 
         # Update trail
-        self.trail_positions.append((self.x, self.y))
-        if len(self.trail_positions) > 8:  # Longer trail than particles
-            self.trail_positions.pop(0)
-
-    def draw(self, screen):
-        # Draw colorful trail
-        for i, (trail_x, trail_y) in enumerate(self.trail_positions[:-1]):
-            trail_alpha = (i / len(self.trail_positions)) * 0.8
+        head = self.trail_head
+        self.trail_x[head] = self.x
+        self.trail_y[head] = self.y
+        self.trail_head = (head + 1) % BULLET_TRAIL_LENGTH
+        if self.trail_count < BULLET_TRAIL_LENGTH:
+            self.trail_count += 1
+
+    def draw(self, screen, alpha=1.0):
+        # Draw colorful trail, oldest first, leaving out the newest position
+        count = self.trail_count
+        oldest = self.trail_head - count
+        for i in range(max(0, count - quality.settings.bullet_trail), count - 1):
+            slot = (oldest + i) % BULLET_TRAIL_LENGTH
+            trail_alpha = (i / count) * 0.8
             trail_color = tuple(int(c * trail_alpha) for c in self.color)
             if sum(trail_color) > 0:
                 trail_size = max(1, int(3 * trail_alpha))
-                pygame.draw.circle(screen, trail_color, (int(trail_x), int(trail_y)), trail_size)
+                pygame.draw.circle(screen, trail_color, (int(self.trail_x[slot]), int(self.trail_y[slot])), trail_size)
 
         # Main bullet with pulsing glow
         pulse = 0.7 + 0.3 * math.sin(time.time() * 15 + self.pulse_offset)
         main_color = tuple(int(c * pulse) for c in self.color)
 
         # Draw main bullet with glow effect
-        pygame.draw.circle(screen, main_color, (int(self.x), int(self.y)), 3)
+        position = (int(interpolate(self.prev_x, self.x, alpha, WIDTH)),
+                    int(interpolate(self.prev_y, self.y, alpha, HEIGHT)))
+        pygame.draw.circle(screen, main_color, position, 3)
 
         # Bright center
         center_color = tuple(min(255, int(c * 1.3)) for c in main_color)
-        pygame.draw.circle(screen, center_color, (int(self.x), int(self.y)), 2)
+        pygame.draw.circle(screen, center_color, position, 2)
 
         # Outer glow
         glow_color = tuple(int(c * 0.4) for c in self.color)
-        pygame.draw.circle(screen, glow_color, (int(self.x), int(self.y)), 5, 1)
+        pygame.draw.circle(screen, glow_color, position, 5, 1)
 
 class Asteroid:
     def __init__(self, x, y, size=3):
         self.x = x
         self.y = y
         self.size = size
-        self.vel_x = random.uniform(-3, 3)
-        self.vel_y = random.uniform(-3, 3)
-        self.angle = random.uniform(0, 360)
-        self.rotation_speed = random.uniform(-5, 5)
+        self.prev_x = x
+        self.prev_y = y
+        self.vel_x, self.vel_y = rng.gameplay.uniform(-3, 3, 2).tolist()
+        self.angle = rng.visual.uniform(0, 360)
+        self.prev_angle = self.angle
+        self.rotation_speed = rng.visual.uniform(-5, 5)
         self.radius = 20 + size * 10
         self.shape_points = self.generate_shape()
+        # Outline as one radius per vertex; shape_points never change, so this is fixed
+        self.vertex_radii = np.array([radius_variation * self.radius for _, radius_variation in self.shape_points])
 
         # Colorful asteroid varieties
         self.asteroid_colors = [
@@ -910,22 +1510,23 @@ class Asteroid:
             BRIGHT_RED, BRIGHT_BLUE, HOT_PINK, NEON_GREEN,
             CRIMSON, SAPPHIRE, ELECTRIC_BLUE, PURPLE
         ]
-        self.color = random.choice(self.asteroid_colors)
+        self.color = rng.visual.choice(self.asteroid_colors)
 
         # Add some asteroids with special glow effects
-        self.glow_intensity = random.uniform(0.5, 1.0)
-        self.pulse_speed = random.uniform(2, 6)
+        self.glow_intensity = rng.visual.uniform(0.5, 1.0)
+        self.pulse_speed = rng.visual.uniform(2, 6)
 
     def generate_shape(self):
         points = []
         num_points = 8
         for i in range(num_points):
             angle = (360 / num_points) * i
-            radius_variation = random.uniform(0.7, 1.3)
+            radius_variation = rng.visual.uniform(0.7, 1.3)
             points.append((angle, radius_variation))
         return points
 
     def update(self):
+        self.prev_x, self.prev_y, self.prev_angle = self.x, self.y, self.angle
         self.x += self.vel_x
         self.y += self.vel_y
         self.angle += self.rotation_speed
@@ -933,15 +1534,11 @@ class Asteroid:
         self.x = self.x % WIDTH
         self.y = self.y % HEIGHT
 
-    def draw(self, screen):
-        import time
-        points = []
-        for angle_offset, radius_variation in self.shape_points:
-            angle = angle_offset + self.angle
-            actual_radius = radius_variation * self.radius
-            point_x = self.x + math.cos(math.radians(angle)) * actual_radius
-            point_y = self.y + math.sin(math.radians(angle)) * actual_radius
-            points.append((point_x, point_y))
+    def draw(self, screen, alpha=1.0, outline=None):
+        # outline is this asteroid's (center, points, inner_points) from asteroid_outlines
+        if outline is None:
+            outline = next(asteroid_outlines([self], alpha))
+        center, points, inner_points = outline
 
         # Pulsing glow effect
         pulse = self.glow_intensity * (0.8 + 0.2 * math.sin(time.time() * self.pulse_speed))
@@ -952,14 +1549,6 @@ class Asteroid:
 
         # Inner glow effect
         if self.size >= 2:  # Only larger asteroids get inner glow
-            inner_points = []
-            for angle_offset, radius_variation in self.shape_points:
-                angle = angle_offset + self.angle
-                actual_radius = radius_variation * self.radius * 0.6
-                point_x = self.x + math.cos(math.radians(angle)) * actual_radius
-                point_y = self.y + math.sin(math.radians(angle)) * actual_radius
-                inner_points.append((point_x, point_y))
-
             # Bright inner color
             inner_color = tuple(min(255, int(c * 1.3)) for c in main_color)
             pygame.draw.polygon(screen, inner_color, inner_points, 2)
@@ -967,41 +1556,206 @@ class Asteroid:
         # Outer glow rings for extra large asteroids
         if self.size >= 3:
             glow_color = tuple(int(c * 0.3) for c in self.color)
-            pygame.draw.circle(screen, glow_color, (int(self.x), int(self.y)), int(self.radius * 1.2), 1)
-            pygame.draw.circle(screen, glow_color, (int(self.x), int(self.y)), int(self.radius * 1.4), 1)
-
-    def get_explosion_particles(self):
-        particles = []
-        for _ in range(10 + self.size * 8):  # More particles
-            vel_x = random.uniform(-8, 8)  # Faster particles
-            vel_y = random.uniform(-8, 8)
-
-            # Use asteroid's color scheme plus some extras
-            explosion_colors = [
-                self.color,
-                tuple(min(255, c + 50) for c in self.color),  # Brighter version
-                WHITE, YELLOW, ORANGE, BRIGHT_RED,
-                GOLD, ELECTRIC_BLUE, HOT_PINK, NEON_GREEN
-            ]
-            color = random.choice(explosion_colors)
-
+            center = (int(center[0]), int(center[1]))
+            for scale in (1.2, 1.4)[:quality.settings.glow_rings]:
+                pygame.draw.circle(screen, glow_color, center, int(self.radius * scale), 1)
+
+    def emit_explosion_particles(self, particle_system):
+        # Use asteroid's color scheme plus some extras
+        explosion_colors = [
+            self.color,
+            tuple(min(255, c + 50) for c in self.color),  # Brighter version
+            WHITE, YELLOW, ORANGE, BRIGHT_RED,
+            GOLD, ELECTRIC_BLUE, HOT_PINK, NEON_GREEN
+        ]
+        vel_x, vel_y, colors, lives = [], [], [], []
+        for _ in range(quality.scaled(10 + self.size * 8)):  # More particles
+            vel_x.append(rng.visual.uniform(-8, 8))  # Faster particles
+            vel_y.append(rng.visual.uniform(-8, 8))
+            colors.append(rng.visual.choice(explosion_colors))
             # Longer-lasting particles with variety
-            life = random.randint(30, 60)
-            particles.append(Particle(self.x, self.y, vel_x, vel_y, color, life))
+            lives.append(rng.visual.randint(30, 60))
 
         # Add some special sparkle particles
-        for _ in range(5):
-            vel_x = random.uniform(-3, 3)
-            vel_y = random.uniform(-3, 3)
-            sparkle_colors = [GOLD, SILVER, WHITE, CYAN, MAGENTA, YELLOW]
-            color = random.choice(sparkle_colors)
-            particles.append(Particle(self.x, self.y, vel_x, vel_y, color, 80))
-
-        return particles
+        sparkle_colors = [GOLD, SILVER, WHITE, CYAN, MAGENTA, YELLOW]
+        for _ in range(quality.scaled(5)):
+            vel_x.append(rng.visual.uniform(-3, 3))
+            vel_y.append(rng.visual.uniform(-3, 3))
+            colors.append(rng.visual.choice(sparkle_colors))
+            lives.append(80)
+
+        particle_system.emit(self.x, self.y, vel_x, vel_y, colors, lives)
+
+# Rotation lookup at 1 degree resolution, shared by every asteroid outline
+ROTATION_COS = np.cos(np.radians(np.arange(360)))
+ROTATION_SIN = np.sin(np.radians(np.arange(360)))
+ASTEROID_VERTEX_ANGLES = np.arange(8) * 45
+
+def asteroid_outlines(asteroids, alpha=1.0):
+    # (center, outer polygon, inner-glow polygon) for every asteroid from one
+    # NumPy pass: angles are quantized to whole degrees and looked up in the
+    # rotation table, positions are interpolated between simulation steps
+    if not asteroids:
+        return iter(())
+    state = np.array([(asteroid.prev_x, asteroid.prev_y, asteroid.prev_angle,
+                       asteroid.x, asteroid.y, asteroid.angle) for asteroid in asteroids])
+    previous, current = state[:, :3], state[:, 3:]
+    delta = current - previous
+    wrapped = np.abs(delta[:, :2]) > np.array([WIDTH, HEIGHT]) / 2
+    blended = previous + delta * alpha
+    centers = np.where(wrapped, current[:, :2], blended[:, :2])
+    angles = np.rint(blended[:, 2]).astype(int)
+    radii = np.stack([asteroid.vertex_radii for asteroid in asteroids])
+    vertex_angles = (angles[:, None] + ASTEROID_VERTEX_ANGLES) % 360
+    offsets = radii[..., None] * np.stack((ROTATION_COS[vertex_angles], ROTATION_SIN[vertex_angles]), axis=-1)
+    outer = centers[:, None, :] + offsets
+    inner = centers[:, None, :] + offsets * 0.6
+    return zip(centers.tolist(), outer.tolist(), inner.tolist())
+
+def draw_asteroids(screen, asteroids, alpha=1.0):
+    for asteroid, outline in zip(asteroids, asteroid_outlines(asteroids, alpha)):
+        asteroid.draw(screen, alpha, outline)
+
+BULLET_RADIUS = 2
+ASTEROID_MAX_RADIUS = 50  # Radius of a full-size (size 3) asteroid
 
 def check_collision(obj1_x, obj1_y, obj1_radius, obj2_x, obj2_y, obj2_radius):
-    distance = math.sqrt((obj1_x - obj2_x)**2 + (obj1_y - obj2_y)**2)
-    return distance < (obj1_radius + obj2_radius)
+    # Compare squared distances to skip the square root
+    dx = obj1_x - obj2_x
+    dy = obj1_y - obj2_y
+    reach = obj1_radius + obj2_radius
+    return dx * dx + dy * dy < reach * reach
+
+class SpatialHash:
+    # Uniform grid over the screen that wraps at the edges like the playfield.
+    # Objects are bucketed by the cell of their centre; a query visits every
+    # cell within its radius plus the largest inserted radius, so only nearby
+    # objects reach the narrow phase.
+    def __init__(self, cell_size, width=WIDTH, height=HEIGHT):
+        self.cols = max(1, int(width // cell_size))
+        self.rows = max(1, int(height // cell_size))
+        self.cell_width = width / self.cols
+        self.cell_height = height / self.rows
+        self.cells = {}
+        self.max_radius = 0
+
+    def clear(self):
+        self.cells.clear()
+        self.max_radius = 0
+
+    def cell(self, x, y):
+        return int(x // self.cell_width) % self.cols, int(y // self.cell_height) % self.rows
+
+    def insert(self, index, x, y, radius):
+        self.cells.setdefault(self.cell(x, y), []).append(index)
+        self.max_radius = max(self.max_radius, radius)
+
+    def build(self, objects):
+        self.clear()
+        for index, obj in enumerate(objects):
+            self.insert(index, obj.x, obj.y, obj.radius)
+
+    def query(self, x, y, radius):
+        # Candidate indices in insertion order, so the first hit matches a linear scan
+        reach = radius + self.max_radius
+        first_col, last_col = int((x - reach) // self.cell_width), int((x + reach) // self.cell_width)
+        first_row, last_row = int((y - reach) // self.cell_height), int((y + reach) // self.cell_height)
+        cols = {col % self.cols for col in range(first_col, last_col + 1)}
+        rows = {row % self.rows for row in range(first_row, last_row + 1)}
+        candidates = []
+        for col in cols:
+            for row in rows:
+                candidates.extend(self.cells.get((col, row), ()))
+        candidates.sort()
+        return candidates
+
+def find_bullet_hits(bullets, asteroids, grid):
+    # Returns (bullet index, asteroid index) pairs. Each bullet takes the first
+    # asteroid it touches and each asteroid is destroyed at most once.
+    grid.build(asteroids)
+    hits = []
+    destroyed = set()
+    for bullet_index, bullet in enumerate(bullets):
+        for asteroid_index in grid.query(bullet.x, bullet.y, BULLET_RADIUS):
+            if asteroid_index in destroyed:
+                continue
+            asteroid = asteroids[asteroid_index]
+            if check_collision(bullet.x, bullet.y, BULLET_RADIUS, asteroid.x, asteroid.y, asteroid.radius):
+                hits.append((bullet_index, asteroid_index))
+                destroyed.add(asteroid_index)
+                break
+    return hits
+
+def find_bullet_hits_scalar(bullets, asteroids, grid=None):
+    # Reference all-pairs scan with check_collision
+    hits = []
+    destroyed = set()
+    for bullet_index, bullet in enumerate(bullets):
+        for asteroid_index, asteroid in enumerate(asteroids):
+            if asteroid_index in destroyed:
+                continue
+            if check_collision(bullet.x, bullet.y, BULLET_RADIUS, asteroid.x, asteroid.y, asteroid.radius):
+                hits.append((bullet_index, asteroid_index))
+                destroyed.add(asteroid_index)
+                break
+    return hits
+
+def batch_collision_hits(bullet_x, bullet_y, bullet_radius, asteroid_x, asteroid_y, asteroid_radius):
+    # For every bullet, the index of the asteroid it destroys or -1. All
+    # bullet/asteroid squared distances come from one broadcast; only bullets
+    # that touch something are resolved in order, so an asteroid hit by an
+    # earlier bullet is skipped exactly like the scalar loop does.
+    bullet_x = np.asarray(bullet_x, dtype=float)
+    hit_index = np.full(len(bullet_x), -1)
+    if len(bullet_x) == 0 or len(asteroid_x) == 0:
+        return hit_index
+    dx = bullet_x[:, None] - np.asarray(asteroid_x, dtype=float)[None, :]
+    dy = np.asarray(bullet_y, dtype=float)[:, None] - np.asarray(asteroid_y, dtype=float)[None, :]
+    reach = np.asarray(bullet_radius, dtype=float).reshape(-1, 1) + np.asarray(asteroid_radius, dtype=float)[None, :]
+    touching = dx * dx + dy * dy < reach * reach
+    destroyed = np.zeros(touching.shape[1], dtype=bool)
+    for bullet_index in np.flatnonzero(touching.any(axis=1)):
+        available = touching[bullet_index] & ~destroyed
+        if available.any():
+            asteroid_index = available.argmax()
+            hit_index[bullet_index] = asteroid_index
+            destroyed[asteroid_index] = True
+    return hit_index
+
+def find_bullet_hits_batch(bullets, asteroids, grid=None):
+    hit_index = batch_collision_hits(
+        [bullet.x for bullet in bullets], [bullet.y for bullet in bullets], BULLET_RADIUS,
+        [asteroid.x for asteroid in asteroids], [asteroid.y for asteroid in asteroids],
+        [asteroid.radius for asteroid in asteroids]
+    )
+    return [(bullet_index, asteroid_index) for bullet_index, asteroid_index in enumerate(hit_index.tolist())
+            if asteroid_index >= 0]
+
+# Interchangeable bullet/asteroid collision passes, selected with --collision-engine
+COLLISION_ENGINES = {
+    'grid': find_bullet_hits,
+    'batch': find_bullet_hits_batch,
+    'scalar': find_bullet_hits_scalar,
+}
+
+def find_ship_hit(player, asteroids, grid):
+    # Index of the first asteroid touching the ship, or None
+    grid.build(asteroids)
+    for asteroid_index in grid.query(player.x, player.y, player.size):
+        asteroid = asteroids[asteroid_index]
+        if check_collision(player.x, player.y, player.size, asteroid.x, asteroid.y, asteroid.radius):
+            return asteroid_index
+    return None
+
+# Shop upgrades as (name, price, save-file field, level bought). Each level
+# needs the one below it.
+SHOP_ITEMS = [
+    ("MULTI SHOT LV1", 300, 'multi_shot_level', 1),
+    ("MULTI SHOT LV2", 800, 'multi_shot_level', 2),
+    ("SHIELD", 500, 'shield_level', 1),
+    ("RAPID FIRE", 350, 'rapid_fire_level', 1),
+]
+SHIP_PRICES = {'astro': 500, 'fighter': 750, 'stealth': 600, 'classic': 400}
 
 def load_game_data():
     try:
@@ -1029,23 +1783,520 @@ def load_game_data():
             'owned_ships': ['default']
         }
 
-def save_game_data(data):
-    try:
-        with open(HIGHSCORE_FILE, 'w') as f:
-            json.dump(data, f)
-    except:
-        pass
+SAVE_DELAY = 0.5  # Seconds a save waits for further changes before writing
+
+class GameDataWriter:
+    # Writes the save file on a background thread so disk I/O never holds up a
+    # frame. save() snapshots the data as JSON and returns at once; saves that
+    # arrive within delay of each other are coalesced into one write of the
+    # newest snapshot. Each write goes to a temp file that os.replace() swaps
+    # in, so a crash leaves the old file or the new one, never half of one.
+    # Failed writes are passed to on_error (default: a warning on stderr).
+    def __init__(self, path=HIGHSCORE_FILE, delay=SAVE_DELAY, on_error=None):
+        self.path = path
+        self.delay = delay
+        self.on_error = on_error or self.report_error
+        self.changed = threading.Condition()
+        self.pending = None
+        self.stop_event = threading.Event()
+        self.writes = 0
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def save(self, data):
+        snapshot = json.dumps(data)
+        with self.changed:
+            self.pending = snapshot
+            self.changed.notify()
+
+    def run(self):
+        while True:
+            with self.changed:
+                while self.pending is None:
+                    if self.stop_event.is_set():
+                        return
+                    self.changed.wait()
+            # Let a burst of changes settle; close() cuts the wait short
+            self.stop_event.wait(self.delay)
+            with self.changed:
+                snapshot, self.pending = self.pending, None
+            self.write(snapshot)
+
+    def write(self, snapshot):
+        temp_path = self.path + '.tmp'
+        try:
+            with open(temp_path, 'w') as f:
+                f.write(snapshot)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+            self.writes += 1
+        except OSError as error:
+            self.on_error(error)
+
+    def report_error(self, error):
+        print(f"Could not save {self.path}: {error}", file=sys.stderr)
+
+    def close(self):
+        # Writes whatever is still pending, then stops the thread
+        with self.changed:
+            self.stop_event.set()
+            self.changed.notify()
+        self.thread.join()
+
+def buy_upgrade(data, item_index):
+    # Spends data['coins'] on SHOP_ITEMS[item_index]; True if it was bought
+    item_name, price, field, level = SHOP_ITEMS[item_index]
+    if data['coins'] >= price and data[field] == level - 1:
+        data['coins'] -= price
+        data[field] = level
+        return True
+    return False
+
+# Most entities of each kind a game keeps at once, so the cost of the worst
+# frame is bounded. Past a budget the oldest bullets are dropped, asteroids
+# stop splitting and new waves shrink; particles evict their own, see
+# ParticleSystem.
+MAX_PARTICLES = 4000
+MAX_BULLETS = BULLET_POOL_SIZE
+MAX_ASTEROIDS = 100
 
 def spawn_asteroids(num_asteroids, player):
-    asteroids = []
-    for _ in range(num_asteroids):
-        while True:
-            x = random.randint(0, WIDTH)
-            y = random.randint(0, HEIGHT)
-            if math.sqrt((x - player.x)**2 + (y - player.y)**2) > 100:
-                asteroids.append(Asteroid(x, y))
-                break
-    return asteroids
+    # Candidate positions come from the gameplay stream in batches; any within
+    # 100px of the player are thrown away
+    positions = np.empty((0, 2), dtype=int)
+    while len(positions) < num_asteroids:
+        candidates = rng.gameplay.integers(0, (WIDTH + 1, HEIGHT + 1), size=(2 * num_asteroids, 2))
+        clear = np.hypot(candidates[:, 0] - player.x, candidates[:, 1] - player.y) > 100
+        positions = np.concatenate((positions, candidates[clear]))
+    return [Asteroid(x, y) for x, y in positions[:num_asteroids].tolist()]
+
+# One simulation step's worth of input. fire and shield are presses, the
+# rest are held.
+Controls = collections.namedtuple('Controls', ['rotate_left', 'rotate_right', 'thrust', 'fire', 'shield'])
+IDLE_CONTROLS = Controls(False, False, False, False, False)
+
+class KeyboardController:
+    # Steering is read from the held keys. Fire and shield are KEYDOWN events
+    # that main() hands to press(); they count once, on the next step.
+    def __init__(self):
+        self.fire = False
+        self.shield = False
+
+    def press(self, key):
+        if key == pygame.K_SPACE:
+            self.fire = True
+        elif key == pygame.K_x:
+            self.shield = True
+
+    def controls(self, world):
+        keys = pygame.key.get_pressed()
+        controls = Controls(keys[pygame.K_LEFT], keys[pygame.K_RIGHT], keys[pygame.K_UP], self.fire, self.shield)
+        self.fire = False
+        self.shield = False
+        return controls
+
+class RandomController:
+    # Mashes the controls; good enough for soak tests and as a baseline pilot
+    def __init__(self, seed=None, fire_chance=0.2):
+        self.random = random.Random(seed)
+        self.fire_chance = fire_chance
+        self.held = IDLE_CONTROLS
+
+    def controls(self, world):
+        if self.random.random() < 0.1:
+            turn = self.random.choice((-1, 0, 0, 1))
+            self.held = Controls(turn < 0, turn > 0, self.random.random() < 0.4, False, False)
+        return self.held._replace(fire=self.random.random() < self.fire_chance,
+                                  shield=self.random.random() < 0.01)
+
+class AimingController:
+    # Scripted pilot: turns toward the nearest asteroid (across the screen
+    # wrap), fires when roughly lined up, closes distance on far targets and
+    # raises the shield when something gets too close
+    def __init__(self, seed=None, aim_error=8.0, fire_interval=6):
+        self.random = random.Random(seed)
+        self.aim_error = aim_error
+        self.fire_interval = fire_interval
+        self.cooldown = 0
+
+    def controls(self, world):
+        player = world.player
+        target = None
+        nearest = float('inf')
+        for asteroid in world.asteroids:
+            dx = (asteroid.x - player.x + WIDTH / 2) % WIDTH - WIDTH / 2
+            dy = (asteroid.y - player.y + HEIGHT / 2) % HEIGHT - HEIGHT / 2
+            distance = math.sqrt(dx * dx + dy * dy) - asteroid.radius
+            if distance < nearest:
+                nearest, target = distance, (dx, dy)
+        if target is None:
+            return IDLE_CONTROLS
+
+        bearing = math.degrees(math.atan2(target[1], target[0])) + self.random.uniform(-self.aim_error, self.aim_error)
+        turn = (bearing - player.angle + 180) % 360 - 180
+        self.cooldown -= 1
+        fire = abs(turn) < 10 and self.cooldown <= 0
+        if fire:
+            self.cooldown = self.fire_interval
+        return Controls(turn < -3, turn > 3, nearest > 250, fire, nearest < 30)
+
+class GameWorld:
+    # Everything that moves during GameState.PLAYING. step() advances it by
+    # exactly one fixed simulation step; draw() renders it at any point
+    # between the last two steps.
+    def __init__(self, sound_manager, coins=0, collision_engine='grid', seed=None, profiler=None):
+        # Every game restarts the random streams from its own seed, which is
+        # all a recording needs besides the input
+        if seed is None:
+            seed = rng.game_seed()
+        rng.reseed(seed)
+        self.seed = seed
+        self.sound_manager = sound_manager
+        self.player = Player(WIDTH // 2, HEIGHT // 2)
+        self.bullets = []
+        self.asteroids = spawn_asteroids(3, self.player)
+        self.particles = ParticleSystem(seed=rng.visual.getrandbits(64), budget=MAX_PARTICLES)
+        self.collision_grid = SpatialHash(ASTEROID_MAX_RADIUS)
+        self.find_hits = COLLISION_ENGINES[collision_engine]
+        self.score = 0
+        self.lives = 3
+        self.coins = coins
+        self.steps = 0
+        self.profiler = profiler or NullProfiler()
+        # How many times each entity budget has been hit this game
+        self.budget_hits = collections.Counter(particles=0, bullets=0, asteroids=0)
+
+    def fire(self, multi_shot_level=0, rapid_fire_level=0):
+        player = self.player
+        if rapid_fire_level == 0 or player.rapid_fire_cooldown <= 0:
+            if multi_shot_level == 0:
+                bullet = Bullet.spawn(player.x, player.y, player.angle)
+                self.bullets.append(bullet)
+            elif multi_shot_level == 1:
+                for angle_offset in [-15, 0, 15]:
+                    bullet = Bullet.spawn(player.x, player.y, player.angle + angle_offset)
+                    self.bullets.append(bullet)
+            elif multi_shot_level == 2:
+                for angle_offset in [-20, -10, 0, 10, 20]:
+                    bullet = Bullet.spawn(player.x, player.y, player.angle + angle_offset)
+                    self.bullets.append(bullet)
+            self.sound_manager.play('shoot')
+            if rapid_fire_level > 0:
+                player.rapid_fire_cooldown = max(1, 10 - rapid_fire_level * 5)
+            excess = len(self.bullets) - MAX_BULLETS
+            if excess > 0:
+                # Bullets are appended as they are fired, so the oldest lead the list
+                self.budget_hits['bullets'] += 1
+                for bullet in self.bullets[:excess]:
+                    Bullet.release(bullet)
+                del self.bullets[:excess]
+
+    def activate_shield(self):
+        self.player.shield_time = 180
+        self.player.shield_active = True
+        self.sound_manager.play('shield_activate')
+
+    def step(self, controls, multi_shot_level=0, shield_level=0, rapid_fire_level=0, speed_boost_level=0):
+        # Returns True on the step where the last life is lost
+        sound_manager = self.sound_manager
+        player = self.player
+        particles = self.particles
+        profiler = self.profiler
+        game_over = False
+        self.steps += 1
+
+        if controls.fire:
+            self.fire(multi_shot_level, rapid_fire_level)
+        if controls.shield and shield_level > 0 and not player.shield_active:
+            self.activate_shield()
+
+        player.update(controls, sound_manager, speed_boost_level)
+        player.emit_thrust_particles(particles)
+        profiler.lap('player')
+
+        live_bullets = []
+        for bullet in self.bullets:
+            bullet.update()
+            if bullet.life > 0:
+                live_bullets.append(bullet)
+            else:
+                Bullet.release(bullet)
+        self.bullets = live_bullets
+        profiler.lap('bullets')
+
+        for asteroid in self.asteroids:
+            asteroid.update()
+        profiler.lap('asteroids')
+
+        particles.update()
+        profiler.lap('particles')
+
+        hits = self.find_hits(self.bullets, self.asteroids, self.collision_grid)
+        if hits:
+            new_asteroids = []
+            # Room left for fragments, counting the asteroids this step destroys
+            room = MAX_ASTEROIDS - len(self.asteroids) + len({asteroid_index for _, asteroid_index in hits})
+            for bullet_index, asteroid_index in hits:
+                asteroid = self.asteroids[asteroid_index]
+                asteroid.emit_explosion_particles(particles)
+                sound_manager.play('explosion')
+                sound_manager.play('coin_collect')
+                self.score += 100 * asteroid.size
+                self.coins += 3 * asteroid.size
+
+                if asteroid.size > 1 and len(new_asteroids) + 2 > room:
+                    self.budget_hits['asteroids'] += 1
+                elif asteroid.size > 1:
+                    for offset_x, offset_y in rng.gameplay.uniform(-20, 20, (2, 2)).tolist():
+                        new_asteroid = Asteroid(
+                            asteroid.x + offset_x,
+                            asteroid.y + offset_y,
+                            asteroid.size - 1
+                        )
+                        new_asteroids.append(new_asteroid)
+
+            spent_bullets = {bullet_index for bullet_index, _ in hits}
+            destroyed = {asteroid_index for _, asteroid_index in hits}
+            for bullet_index in spent_bullets:
+                Bullet.release(self.bullets[bullet_index])
+            self.bullets = [bullet for i, bullet in enumerate(self.bullets) if i not in spent_bullets]
+            self.asteroids = [asteroid for i, asteroid in enumerate(self.asteroids) if i not in destroyed]
+            self.asteroids.extend(new_asteroids)
+
+        if player.invulnerable_time == 0 and not player.shield_active:
+            asteroid_index = find_ship_hit(player, self.asteroids, self.collision_grid)
+            if asteroid_index is not None:
+                self.lives -= 1
+                sound_manager.play('explosion')
+                self.asteroids[asteroid_index].emit_explosion_particles(particles)
+                player.reset_position()
+                game_over = self.lives <= 0
+
+        if not self.asteroids:
+            wave = 3 + self.score // 1500
+            if wave > MAX_ASTEROIDS:
+                self.budget_hits['asteroids'] += 1
+                wave = MAX_ASTEROIDS
+            self.asteroids = spawn_asteroids(wave, player)
+        self.budget_hits['particles'] = particles.budget_hits
+        profiler.lap('collisions')
+
+        return game_over
+
+    def draw(self, screen, ship_skin='default', alpha=1.0):
+        self.player.draw(screen, ship_skin, alpha)
+
+        for bullet in self.bullets:
+            bullet.draw(screen, alpha)
+
+        draw_asteroids(screen, self.asteroids, alpha)
+
+        self.particles.draw(screen, alpha)
+
+def run_headless(controller, max_steps=FPS * 60 * 10, collision_engine='grid', coins=0, upgrades=None,
+                 seed=None):
+    # Plays one game as fast as the CPU allows: no window, audio or keyboard,
+    # input comes from the controller. Stops at game over or after max_steps.
+    # upgrades holds shop levels keyed like the save file (multi_shot_level...)
+    world = GameWorld(NullSoundManager(), coins, collision_engine, seed)
+    upgrades = upgrades or {}
+    while world.steps < max_steps:
+        if world.step(controller.controls(world), **upgrades):
+            break
+    return world
+
+# Recording file: REPLAY_HEADER, then the zlib-compressed input log with one
+# byte of CONTROL_BITS flags per simulation step
+REPLAY_MAGIC = b'ASTR'
+REPLAY_VERSION = 1
+# magic, version, seed, multi shot, shield, rapid fire and speed boost levels,
+# starting coins, final score
+REPLAY_HEADER = struct.Struct('<4sHQBBBBIQ')
+CONTROL_BITS = Controls._fields
+PAUSE_BIT = 1 << len(CONTROL_BITS)  # The game was paused just before this step
+UPGRADE_FIELDS = ('multi_shot_level', 'shield_level', 'rapid_fire_level', 'speed_boost_level')
+
+class InputRecorder:
+    def __init__(self, seed, upgrades, coins=0):
+        self.seed = seed
+        self.upgrades = dict(upgrades)
+        self.coins = coins
+        self.frames = bytearray()
+
+    def __len__(self):
+        return len(self.frames)
+
+    def record(self, controls, paused=False):
+        flags = PAUSE_BIT if paused else 0
+        for bit, pressed in enumerate(controls):
+            if pressed:
+                flags |= 1 << bit
+        self.frames.append(flags)
+
+    def header(self, score):
+        levels = [self.upgrades.get(field, 0) for field in UPGRADE_FIELDS]
+        return REPLAY_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, self.seed, *levels, self.coins, score)
+
+    def check(self, path):
+        # Raises what save() would, before the game is played: struct.error if
+        # the header cannot hold the seed, OSError if path cannot be written
+        self.header(0)
+        target = path if os.path.exists(path) else os.path.dirname(path) or '.'
+        if os.path.isdir(path) or not os.access(target, os.W_OK):
+            raise PermissionError(f"cannot write {path}")
+
+    def save(self, path, score):
+        with open(path, 'wb') as f:
+            f.write(self.header(score) + zlib.compress(bytes(self.frames), 9))
+
+class Replay:
+    # A loaded recording. It doubles as the controller that plays it back:
+    # controls() returns the input recorded for the world's current step.
+    def __init__(self, seed, upgrades, coins, score, frames):
+        self.seed = seed
+        self.upgrades = upgrades
+        self.coins = coins
+        self.score = score
+        self.frames = frames
+        self.pauses = sum(1 for flags in frames if flags & PAUSE_BIT)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        fields = REPLAY_HEADER.unpack_from(data)
+        if fields[0] != REPLAY_MAGIC or fields[1] != REPLAY_VERSION:
+            raise ValueError(f"{path} is not a version {REPLAY_VERSION} recording")
+        seed = fields[2]
+        upgrades = dict(zip(UPGRADE_FIELDS, fields[3:7]))
+        coins, score = fields[7:9]
+        return cls(seed, upgrades, coins, score, zlib.decompress(data[REPLAY_HEADER.size:]))
+
+    def __len__(self):
+        return len(self.frames)
+
+    def controls(self, world):
+        if world.steps >= len(self.frames):
+            return IDLE_CONTROLS
+        flags = self.frames[world.steps]
+        return Controls(*(bool(flags & (1 << bit)) for bit in range(len(CONTROL_BITS))))
+
+    def start(self, sound_manager, collision_engine='grid'):
+        return GameWorld(sound_manager, self.coins, collision_engine, self.seed)
+
+def recording_path(path, game):
+    # The first game of a session is saved to path, later ones to path-2, path-3...
+    if game == 1:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}-{game}{ext}"
+
+def save_recording(recorder, path, score):
+    # A recording that cannot be written is reported, never allowed to end the game
+    try:
+        recorder.save(path, score)
+    except (OSError, struct.error) as error:
+        print(f"Could not save recording {path}: {error}", file=sys.stderr)
+
+def run_replay(replay, collision_engine='grid'):
+    # Uncapped headless playback, as fast as the simulation can step
+    world = replay.start(NullSoundManager(), collision_engine)
+    while world.steps < len(replay):
+        world.step(replay.controls(world), **replay.upgrades)
+    return world
+
+def watch_replay(replay, collision_engine='grid', render_fps=FPS):
+    # Real-time playback in a window; ESC stops early
+    init_display()
+    stars = create_starfield(200)
+    world = replay.start(NullSoundManager(), collision_engine)
+    accumulator = 0.0
+    frame_time = SIM_DT
+    while world.steps < len(replay):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                return world
+
+        accumulator += min(frame_time, MAX_FRAME_TIME)
+        while accumulator >= SIM_DT and world.steps < len(replay):
+            accumulator -= SIM_DT
+            world.step(replay.controls(world), **replay.upgrades)
+
+        draw_starfield(screen, stars)
+        world.draw(screen, 'default', accumulator / SIM_DT)
+        draw_text(screen, f"REPLAY   Score: {world.score}   Lives: {world.lives}", 28, WIDTH//2, 20, WHITE)
+        pygame.display.flip()
+        frame_time = clock.tick(render_fps) / 1000.0
+    return world
+
+BALANCE_PILOTS = {
+    'random': RandomController,
+    'aiming': AimingController,
+}
+
+def balance_loadouts():
+    # No upgrades, then each shop item on its own (with the levels it needs)
+    loadouts = {'none': {}}
+    for item_name, price, field, level in SHOP_ITEMS:
+        loadouts[item_name.lower()] = {field: level}
+    return loadouts
+
+def play_balance_game(task):
+    # Runs in a worker process, so it takes and returns plain picklable data
+    seed, pilot, loadout, upgrades, max_steps, collision_engine = task
+    world = run_headless(BALANCE_PILOTS[pilot](seed), max_steps, collision_engine, upgrades=upgrades, seed=seed)
+    return {
+        'loadout': loadout,
+        'score': world.score,
+        'survival': world.steps / FPS,
+        'coins': world.coins,
+        'wave': 3 + world.score // 1500,
+        'survived': world.lives > 0,
+    }
+
+def run_balance(games, pilot='aiming', workers=None, seed=0, max_steps=FPS * 60 * 10, collision_engine='grid'):
+    # Plays `games` seeded games per loadout across a process pool. Every
+    # loadout sees the same seeds, so the differences come from the upgrades.
+    loadouts = balance_loadouts()
+    tasks = [(seed + game, pilot, name, upgrades, max_steps, collision_engine)
+             for name, upgrades in loadouts.items() for game in range(games)]
+    results = {name: [] for name in loadouts}
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        chunksize = max(1, len(tasks) // (4 * (workers or os.cpu_count() or 1)))
+        for result in executor.map(play_balance_game, tasks, chunksize=chunksize):
+            results[result['loadout']].append(result)
+
+    summary = {}
+    for name, games_played in results.items():
+        stats = {'games': len(games_played)}
+        for field in ('score', 'survival', 'coins', 'wave'):
+            values = np.array([game[field] for game in games_played], dtype=float)
+            stats[field] = {
+                'mean': float(values.mean()),
+                'p10': float(np.percentile(values, 10)),
+                'p50': float(np.percentile(values, 50)),
+                'p90': float(np.percentile(values, 90)),
+            }
+        stats['survived'] = sum(game['survived'] for game in games_played) / len(games_played)
+        summary[name] = stats
+    return summary
+
+def print_balance_report(summary):
+    print(f"{'loadout':<16}{'score p50':>10}{'score p90':>10}{'survival s':>12}{'coins':>8}{'wave':>6}{'survived':>10}")
+    for name, stats in summary.items():
+        print(f"{name:<16}{stats['score']['p50']:>10.0f}{stats['score']['p90']:>10.0f}"
+              f"{stats['survival']['mean']:>12.1f}{stats['coins']['mean']:>8.0f}"
+              f"{stats['wave']['mean']:>6.1f}{stats['survived']:>10.0%}")
+
+    # How many upgrade-free games it takes to afford each price
+    coins_per_game = max(summary['none']['coins']['mean'], 1)
+    print()
+    print(f"{'price':<16}{'coins':>10}{'games':>10}")
+    for item_name, price, field, level in SHOP_ITEMS:
+        print(f"{item_name.lower():<16}{price:>10}{price / coins_per_game:>10.1f}")
+    for ship_name, price in SHIP_PRICES.items():
+        print(f"{'ship ' + ship_name:<16}{price:>10}{price / coins_per_game:>10.1f}")
 
 class GameState:
     MENU = 0
@@ -1057,11 +2308,18 @@ class GameState:
     NEW_GAME_CONFIRM = 6
     SOUND_SETTINGS = 7
 
+# Screens that only change when the player does something; between changes
+# main() pushes just the twinkling stars to the display
+STATIC_SCREENS = {
+    GameState.MENU, GameState.SHOP, GameState.SHIP_SELECT, GameState.SOUND_SETTINGS,
+    GameState.NEW_GAME_CONFIRM, GameState.GAME_OVER, GameState.PAUSED,
+}
+
 class Star:
     def __init__(self):
-        self.x = random.randint(0, WIDTH)
-        self.y = random.randint(0, HEIGHT)
-        self.size = random.uniform(0.5, 2.5)
+        self.x = rng.visual.randint(0, WIDTH)
+        self.y = rng.visual.randint(0, HEIGHT)
+        self.size = rng.visual.uniform(0.5, 2.5)
 
         # Colorful stars
         star_colors = [
@@ -1069,14 +2327,16 @@ class Star:
             ELECTRIC_BLUE, CORAL, VIOLET, SILVER,
             TURQUOISE, HOT_PINK, NEON_GREEN
         ]
-        self.color = random.choice(star_colors)
-        self.brightness = random.uniform(0.3, 1.0)
-        self.twinkle_speed = random.uniform(1, 4)
-        self.twinkle_offset = random.uniform(0, math.pi * 2)
+        self.color = rng.visual.choice(star_colors)
+        self.brightness = rng.visual.uniform(0.3, 1.0)
+        self.twinkle_speed = rng.visual.uniform(1, 4)
+        self.twinkle_offset = rng.visual.uniform(0, math.pi * 2)
 
-    def draw(self, screen):
+    def draw(self, screen, now=None):
         # Twinkling effect
-        twinkle = 0.6 + 0.4 * math.sin(time.time() * self.twinkle_speed + self.twinkle_offset)
+        if now is None:
+            now = time.time()
+        twinkle = 0.6 + 0.4 * math.sin(now * self.twinkle_speed + self.twinkle_offset)
         current_brightness = self.brightness * twinkle
 
         # Draw star with twinkling color
@@ -1088,29 +2348,284 @@ class Star:
             sparkle_color = tuple(min(255, int(c * 1.3)) for c in star_color)
             pygame.draw.circle(screen, sparkle_color, (int(self.x), int(self.y)), max(1, int(self.size * 0.4)))
 
+    def rect(self):
+        # Everything draw() can touch, with a pixel to spare
+        radius = max(1, int(self.size)) + 1
+        return pygame.Rect(int(self.x) - radius, int(self.y) - radius, 2 * radius, 2 * radius)
+
+STAR_TWINKLE_GROUPS = 8
+
+class Starfield:
+    # The stars are baked into a cached background surface. Every frame one of
+    # STAR_TWINKLE_GROUPS rotating groups is redrawn onto it at its current
+    # twinkle brightness (a star always covers the same pixels, so redrawing
+    # fully replaces its old look), and the background goes out in one blit.
+    def __init__(self, stars, twinkle_groups=STAR_TWINKLE_GROUPS):
+        self.stars = stars
+        self.twinkle_groups = twinkle_groups
+        self.frame = 0
+        self.background = None
+        self.rects = [star.rect() for star in stars]
+        # Stars that something on the current static screen is drawn over
+        self.covered = [True] * len(stars)
+
+    def __len__(self):
+        return len(self.stars)
+
+    def bake(self, size):
+        self.background = pygame.Surface(size)
+        if pygame.display.get_surface():
+            self.background = self.background.convert()  # Match the display format for fast blits
+        self.background.fill(BLACK)
+        now = time.time()
+        for star in self.stars:
+            star.draw(self.background, now)
+
+    def twinkle(self):
+        now = time.time()
+        group = self.frame % self.twinkle_groups
+        for star in self.stars[group::self.twinkle_groups]:
+            star.draw(self.background, now)
+        self.frame += 1
+
+    def draw(self, screen):
+        if self.background is None or self.background.get_size() != screen.get_size():
+            self.bake(screen.get_size())
+        else:
+            self.twinkle()
+        screen.blit(self.background, (0, 0))
+
+    def cover(self, screen):
+        # Called once a static screen is fully drawn: any star whose pixels on
+        # screen no longer match the background has UI on top of it. Only the
+        # star rects are compared, through views rather than copies.
+        screen_pixels = pygame.surfarray.pixels3d(screen)
+        background_pixels = pygame.surfarray.pixels3d(self.background)
+        bounds = screen.get_rect()
+        for i, rect in enumerate(self.rects):
+            rect = rect.clip(bounds)
+            area = (slice(rect.left, rect.right), slice(rect.top, rect.bottom))
+            self.covered[i] = not np.array_equal(screen_pixels[area], background_pixels[area])
+        del screen_pixels, background_pixels  # The views lock both surfaces
+
+    def refresh(self, screen):
+        # Twinkles the next group and copies only its uncovered stars from the
+        # background to screen; returns the rects for display.update()
+        group = self.frame % self.twinkle_groups
+        self.twinkle()
+        dirty_rects = []
+        for i in range(group, len(self.stars), self.twinkle_groups):
+            if not self.covered[i]:
+                screen.blit(self.background, self.rects[i], self.rects[i])
+                dirty_rects.append(self.rects[i])
+        return dirty_rects
+
 def create_starfield(num_stars=150):
-    return [Star() for _ in range(num_stars)]
+    return Starfield([Star() for _ in range(num_stars)])
 
 def draw_starfield(screen, stars):
-    for star in stars:
-        star.draw(screen)
+    # Also clears the frame, since the baked background is opaque
+    stars.draw(screen)
+
+TEXT_CACHE_SIZE = 256
+
+class TextRenderer:
+    # Fonts are loaded once per size and rendered text surfaces are kept in an
+    # LRU cache keyed by (text, size, color, antialias), so unchanged labels
+    # cost a dictionary lookup instead of a font render every frame.
+    def __init__(self, max_surfaces=TEXT_CACHE_SIZE):
+        self.fonts = {}
+        self.surfaces = collections.OrderedDict()
+        self.max_surfaces = max_surfaces
+
+    def font(self, size):
+        font = self.fonts.get(size)
+        if font is None:
+            font = self.fonts[size] = pygame.font.Font(None, size)
+        return font
+
+    def render(self, text, size, color=WHITE, antialias=True):
+        key = (text, size, tuple(color), antialias)
+        text_surface = self.surfaces.get(key)
+        if text_surface is not None:
+            self.surfaces.move_to_end(key)
+            return text_surface
+        text_surface = self.font(size).render(text, antialias, color)
+        self.surfaces[key] = text_surface
+        if len(self.surfaces) > self.max_surfaces:
+            self.surfaces.popitem(last=False)
+        return text_surface
+
+    def clear(self):
+        self.fonts.clear()
+        self.surfaces.clear()
+
+text_renderer = TextRenderer()
 
 def draw_text(screen, text, size, x, y, color=WHITE):
-    font = pygame.font.Font(None, size)
-    text_surface = font.render(text, True, color)
+    text_surface = text_renderer.render(text, size, color)
     text_rect = text_surface.get_rect()
     text_rect.center = (x, y)
     screen.blit(text_surface, text_rect)
 
-def main():
-    sound_manager = SoundManager()
-    player = Player(WIDTH // 2, HEIGHT // 2)
-    bullets = []
-    asteroids = spawn_asteroids(3, player)
-    particles = []
-    score = 0
-    lives = 3
+PROFILE_PHASES = ('input', 'player', 'bullets', 'asteroids', 'particles', 'collisions',
+                  'starfield', 'entities', 'hud', 'flip')
+PROFILE_COUNTS = ('bullets', 'asteroids', 'particles')
+PROFILE_WINDOW = 300  # Frames behind the rolling percentiles
+PROFILE_REFRESH = 30  # Frames between overlay text updates
+
+class FrameProfiler:
+    # Splits each frame into PROFILE_PHASES with perf_counter_ns. lap(phase)
+    # charges the time since the previous lap to phase, so phases that run
+    # several times a frame (simulation steps) add up. The last PROFILE_WINDOW
+    # frames sit in a ring buffer for percentiles; with keep_trace every frame
+    # is also kept for export().
+    def __init__(self, window=PROFILE_WINDOW, keep_trace=False):
+        self.phase_index = {phase: i for i, phase in enumerate(PROFILE_PHASES)}
+        self.samples = np.zeros((window, len(PROFILE_PHASES)), dtype=np.int64)
+        self.counts = np.zeros((window, len(PROFILE_COUNTS)), dtype=np.int64)
+        self.current = np.zeros(len(PROFILE_PHASES), dtype=np.int64)
+        self.frames = 0
+        self.trace = [] if keep_trace else None
+        self.budget_hits = {}
+        self.visible = False
+        self.overlay_lines = []
+        self.overlay_panel = None
+        self.last = time.perf_counter_ns()
+
+    def begin_frame(self):
+        self.current[:] = 0
+        self.last = time.perf_counter_ns()
+
+    def lap(self, phase):
+        now = time.perf_counter_ns()
+        self.current[self.phase_index[phase]] += now - self.last
+        self.last = now
+
+    def end_frame(self, counts, budget_hits=None):
+        if budget_hits is not None:
+            self.budget_hits = budget_hits
+        slot = self.frames % len(self.samples)
+        self.samples[slot] = self.current
+        self.counts[slot] = counts
+        self.frames += 1
+        if self.trace is not None:
+            self.trace.append((self.current.tolist(), list(counts)))
+
+    def percentiles(self):
+        # {phase: (p50, p95, p99) in ms} over the window, plus 'total'
+        samples = self.samples[:min(self.frames, len(self.samples))]
+        if len(samples) == 0:
+            return {}
+        samples = np.column_stack((samples, samples.sum(axis=1))) / 1e6
+        table = np.percentile(samples, (50, 95, 99), axis=0)
+        return {phase: tuple(table[:, i]) for i, phase in enumerate(PROFILE_PHASES + ('total',))}
+
+    def toggle(self):
+        self.visible = not self.visible
+        self.overlay_lines = []
+
+    def draw(self, screen):
+        if not self.visible:
+            return
+        if not self.overlay_lines or self.frames % PROFILE_REFRESH == 0:
+            latest = self.counts[(self.frames - 1) % len(self.counts)]
+            self.overlay_lines = [("phase (ms)", "p50", "p95", "p99")]
+            for phase, values in self.percentiles().items():
+                self.overlay_lines.append((phase,) + tuple(f"{value:.2f}" for value in values))
+            self.overlay_lines.append(("  ".join(f"{name} {count}" for name, count in zip(PROFILE_COUNTS, latest)),))
+            self.overlay_lines.append((f"quality {quality.settings.name}",))
+            self.overlay_lines.append(("budget hits  " + "  ".join(f"{name} {count}" for name, count in self.budget_hits.items()),))
+
+        # The translucent backing only changes size with the number of lines
+        panel_height = 16 * len(self.overlay_lines) + 8
+        if self.overlay_panel is None or self.overlay_panel.get_height() != panel_height:
+            self.overlay_panel = pygame.Surface((300, panel_height), pygame.SRCALPHA)
+            self.overlay_panel.fill((0, 0, 0, 170))
+        top = HEIGHT - panel_height - 10
+        screen.blit(self.overlay_panel, (10, top))
+        # Phase names left-aligned, the three percentile columns right-aligned
+        for i, (label, *values) in enumerate(self.overlay_lines):
+            y = top + 4 + 16 * i
+            screen.blit(text_renderer.render(label, 18, NEON_GREEN), (16, y))
+            for column, value in enumerate(values):
+                text = text_renderer.render(value, 18, NEON_GREEN)
+                screen.blit(text, (150 + 50 * column - text.get_width(), y))
+
+    def export(self, path):
+        # CSV (one row per frame, times in ns) or JSON (rows plus percentiles),
+        # picked by the file extension
+        if path.endswith('.json'):
+            data = {
+                'phases': list(PROFILE_PHASES),
+                'counts': list(PROFILE_COUNTS),
+                'frames': [{'ns': times, 'counts': counts} for times, counts in self.trace],
+                'percentiles_ms': {phase: dict(zip(('p50', 'p95', 'p99'), values))
+                                   for phase, values in self.percentiles().items()},
+            }
+            with open(path, 'w') as f:
+                json.dump(data, f)
+        else:
+            with open(path, 'w') as f:
+                count_columns = tuple(name + '_count' for name in PROFILE_COUNTS)
+                f.write(','.join(('frame',) + PROFILE_PHASES + ('total',) + count_columns) + '\n')
+                for frame, (times, counts) in enumerate(self.trace):
+                    f.write(','.join(map(str, [frame] + times + [sum(times)] + counts)) + '\n')
+
+class NullProfiler:
+    # What GameWorld times itself with when nobody is profiling
+    def lap(self, phase):
+        pass
+
+IDLE_FPS = 15  # Frame rate of a static screen nobody is touching
+IDLE_DELAY = 2.0  # Seconds without input before a static screen slows down
+MAX_IDLE_WAIT_MS = 250  # Longest block; streamed music needs feeding more often than this
+
+class FramePacer:
+    # Runs the main loop at render_fps while anything animates. Once a static
+    # screen has seen no input for idle_delay seconds it drops to idle_fps,
+    # blocking in pygame.event.wait() so a key press still wakes it at once.
+    # idle_fps 0 wakes only for input and to keep the music fed.
+    def __init__(self, render_fps=FPS, idle_fps=IDLE_FPS, idle_delay=IDLE_DELAY):
+        self.render_fps = render_fps
+        self.idle_fps = idle_fps
+        self.idle_delay = idle_delay
+        self.pending = []  # The event that ended an idle wait
+        self.last_input = time.perf_counter()
+
+    def events(self):
+        events = self.pending + pygame.event.get()
+        self.pending = []
+        if events:
+            self.last_input = time.perf_counter()
+        return events
+
+    def wait(self, idle):
+        # Ends the frame; returns the seconds of game time it covered
+        if not idle or time.perf_counter() - self.last_input < self.idle_delay:
+            return clock.tick(self.render_fps) / 1000.0
+        timeout = MAX_IDLE_WAIT_MS
+        if self.idle_fps > 0:
+            timeout = min(timeout, 1000 // self.idle_fps)
+        event = pygame.event.wait(timeout)
+        if event.type != pygame.NOEVENT:
+            self.pending.append(event)
+        clock.tick()
+        # Nothing was simulating, so waking up never owes the simulation a burst
+        return SIM_DT
+
+def main(sound_cache=None, collision_engine='grid', render_fps=FPS, seed=None, record=None, profile_trace=None,
+         idle_fps=IDLE_FPS, idle_delay=IDLE_DELAY, quality_level=None):
+    init_audio()
+    init_display()
+    rng.reseed(seed)
+    # Visual detail follows the measured frame time unless quality_level pins it
+    quality.reset(1.0 / (render_fps or FPS), quality_level)
+    # Sounds are only pinned to the session seed when one is given; unseeded
+    # sessions keep sharing the default sound cache entries
+    sound_manager = SoundManager(seed=rng.audio_seed if seed is not None else None, cache=sound_cache)
     game_data = load_game_data()
+    game_data_writer = GameDataWriter()
     high_score = game_data['high_score']
     coins = game_data['coins']
     ship_skin = game_data['ship_skin']
@@ -1119,24 +2634,50 @@ def main():
     rapid_fire_level = game_data['rapid_fire_level']
     speed_boost_level = game_data['speed_boost_level']
     owned_ships = game_data['owned_ships']
+    # F3 shows the frame profiler; with profile_trace every frame is exported on exit
+    profiler = FrameProfiler(keep_trace=profile_trace is not None)
+    world = GameWorld(sound_manager, coins, collision_engine, rng.session_seed, profiler)
+    controller = KeyboardController()
+    # With record set, each game's input is written to recording_path(record, n)
+    recorder = None
+    recorded_games = 0
+    paused = False
     game_state = GameState.MENU
-    font = pygame.font.Font(None, 36)
+    hud_font_size = 36
     shop_selection = 0
     ship_selection = 0
     sound_selection = 0
 
     # Create colorful starfield background
     stars = create_starfield(200)
+    # What the static screen on the display currently shows, see STATIC_SCREENS
+    drawn_ui_key = None
+    confirm_overlay = pygame.Surface((WIDTH, HEIGHT))
+    confirm_overlay.set_alpha(128)
+    confirm_overlay.fill(BLACK)
+
+    # Seconds of real time not yet simulated, and the length of the last frame
+    accumulator = 0.0
+    frame_time = SIM_DT
+    pacer = FramePacer(render_fps, idle_fps, idle_delay)
 
     running = True
     while running:
-        for event in pygame.event.get():
+        profiler.begin_frame()
+        for event in pacer.events():
             if event.type == pygame.QUIT:
+                if recorder is not None:
+                    save_recording(recorder, recording_path(record, recorded_games), world.score)
                 running = False
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                profiler.toggle()
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                drawn_ui_key = None  # The window contents were lost
             elif event.type == pygame.KEYDOWN:
                 if game_state == GameState.MENU:
                     if event.key == pygame.K_RETURN:
                         sound_manager.play('menu_confirm')
+                        world.coins = coins  # Pick up any shop spending
                         game_state = GameState.PLAYING
                     elif event.key == pygame.K_s:
                         sound_manager.play('menu_select')
@@ -1157,36 +2698,25 @@ def main():
                         game_state = GameState.MENU
                     elif event.key == pygame.K_UP:
                         sound_manager.play('menu_select')
-                        shop_selection = (shop_selection - 1) % 4
+                        shop_selection = (shop_selection - 1) % len(SHOP_ITEMS)
                     elif event.key == pygame.K_DOWN:
                         sound_manager.play('menu_select')
-                        shop_selection = (shop_selection + 1) % 4
+                        shop_selection = (shop_selection + 1) % len(SHOP_ITEMS)
                     elif event.key == pygame.K_RETURN:
-                        purchased = False
-                        if shop_selection == 0 and coins >= 300 and multi_shot_level == 0:
-                            coins -= 300
-                            multi_shot_level = 1
-                            purchased = True
-                        elif shop_selection == 1 and coins >= 800 and multi_shot_level == 1:
-                            coins -= 800
-                            multi_shot_level = 2
-                            purchased = True
-                        elif shop_selection == 2 and coins >= 500 and shield_level == 0:
-                            coins -= 500
-                            shield_level = 1
-                            purchased = True
-                        elif shop_selection == 3 and coins >= 350 and rapid_fire_level == 0:
-                            coins -= 350
-                            rapid_fire_level = 1
-                            purchased = True
-
-                        if purchased:
+                        purchase = {
+                            'coins': coins,
+                            'multi_shot_level': multi_shot_level,
+                            'shield_level': shield_level,
+                            'rapid_fire_level': rapid_fire_level,
+                        }
+                        if buy_upgrade(purchase, shop_selection):
                             sound_manager.play('powerup')
-                            game_data['coins'] = coins
-                            game_data['multi_shot_level'] = multi_shot_level
-                            game_data['shield_level'] = shield_level
-                            game_data['rapid_fire_level'] = rapid_fire_level
-                            save_game_data(game_data)
+                            coins = purchase['coins']
+                            multi_shot_level = purchase['multi_shot_level']
+                            shield_level = purchase['shield_level']
+                            rapid_fire_level = purchase['rapid_fire_level']
+                            game_data.update(purchase)
+                            game_data_writer.save(game_data)
                 elif game_state == GameState.SHIP_SELECT:
                     if event.key == pygame.K_ESCAPE:
                         game_state = GameState.MENU
@@ -1200,18 +2730,16 @@ def main():
                         sound_manager.play('menu_confirm')
                         ship_skin = owned_ships[ship_selection]
                         game_data['ship_skin'] = ship_skin
-                        save_game_data(game_data)
+                        game_data_writer.save(game_data)
                     elif event.key == pygame.K_b:
-                        ship_names = ['astro', 'fighter', 'stealth', 'classic']
-                        prices = [500, 750, 600, 400]
-                        for i, (ship_name, price) in enumerate(zip(ship_names, prices)):
+                        for ship_name, price in SHIP_PRICES.items():
                             if ship_name not in owned_ships and coins >= price:
                                 sound_manager.play('powerup')
                                 coins -= price
                                 owned_ships.append(ship_name)
                                 game_data['coins'] = coins
                                 game_data['owned_ships'] = owned_ships
-                                save_game_data(game_data)
+                                game_data_writer.save(game_data)
                                 break
                 elif game_state == GameState.SOUND_SETTINGS:
                     if event.key == pygame.K_ESCAPE:
@@ -1250,7 +2778,7 @@ def main():
                             'speed_boost_level': 0,
                             'owned_ships': ['default']
                         }
-                        save_game_data(game_data)
+                        game_data_writer.save(game_data)
 
                         # Reset local variables
                         coins = 0
@@ -1260,333 +2788,404 @@ def main():
                         rapid_fire_level = 0
                         speed_boost_level = 0
                         owned_ships = ['default']
-                        score = 0
-                        lives = 3
 
                         # Reset player and game objects
-                        player = Player(WIDTH // 2, HEIGHT // 2)
-                        bullets = []
-                        asteroids = spawn_asteroids(3, player)
-                        particles = []
+                        world = GameWorld(sound_manager, coins, collision_engine, profiler=profiler)
 
                         game_state = GameState.MENU
                     elif event.key == pygame.K_n or event.key == pygame.K_ESCAPE:
                         game_state = GameState.MENU
                 elif game_state == GameState.PLAYING:
-                    if event.key == pygame.K_SPACE:
-                        if rapid_fire_level == 0 or player.rapid_fire_cooldown <= 0:
-                            if multi_shot_level == 0:
-                                bullet = Bullet(player.x, player.y, player.angle)
-                                bullets.append(bullet)
-                            elif multi_shot_level == 1:
-                                for angle_offset in [-15, 0, 15]:
-                                    bullet = Bullet(player.x, player.y, player.angle + angle_offset)
-                                    bullets.append(bullet)
-                            elif multi_shot_level == 2:
-                                for angle_offset in [-20, -10, 0, 10, 20]:
-                                    bullet = Bullet(player.x, player.y, player.angle + angle_offset)
-                                    bullets.append(bullet)
-                            sound_manager.play('shoot')
-                            if rapid_fire_level > 0:
-                                player.rapid_fire_cooldown = max(1, 10 - rapid_fire_level * 5)
-                    elif event.key == pygame.K_x and shield_level > 0 and not player.shield_active:
-                        player.shield_time = 180
-                        player.shield_active = True
-                        sound_manager.play('shield_activate')
-                    elif event.key == pygame.K_p:
+                    if event.key == pygame.K_p:
                         game_state = GameState.PAUSED
+                        paused = True
+                    else:
+                        controller.press(event.key)
                 elif game_state == GameState.PAUSED:
                     if event.key == pygame.K_p:
                         game_state = GameState.PLAYING
                 elif game_state == GameState.GAME_OVER:
                     if event.key == pygame.K_r:
-                        player = Player(WIDTH // 2, HEIGHT // 2)
-                        bullets = []
-                        asteroids = spawn_asteroids(3, player)
-                        particles = []
-                        score = 0
-                        lives = 3
+                        world = GameWorld(sound_manager, coins, collision_engine, profiler=profiler)
                         game_state = GameState.PLAYING
                     elif event.key == pygame.K_m:
                         game_state = GameState.MENU
 
-        if game_state == GameState.PLAYING:
-            player.update(sound_manager, speed_boost_level)
-            particles.extend(player.get_thrust_particles())
-
-            for bullet in bullets[:]:
-                bullet.update()
-                if bullet.life <= 0:
-                    bullets.remove(bullet)
-
-            for asteroid in asteroids:
-                asteroid.update()
-
-            for particle in particles[:]:
-                particle.update()
-                if particle.life <= 0:
-                    particles.remove(particle)
-
-            for bullet in bullets[:]:
-                for asteroid in asteroids[:]:
-                    if check_collision(bullet.x, bullet.y, 2, asteroid.x, asteroid.y, asteroid.radius):
-                        bullets.remove(bullet)
-                        particles.extend(asteroid.get_explosion_particles())
-                        asteroids.remove(asteroid)
-                        sound_manager.play('explosion')
-                        sound_manager.play('coin_collect')
-                        score += 100 * asteroid.size
-                        coins += 3 * asteroid.size
-
-                        if asteroid.size > 1:
-                            for _ in range(2):
-                                new_asteroid = Asteroid(
-                                    asteroid.x + random.uniform(-20, 20),
-                                    asteroid.y + random.uniform(-20, 20),
-                                    asteroid.size - 1
-                                )
-                                asteroids.append(new_asteroid)
-                        break
-
-            if player.invulnerable_time == 0 and not player.shield_active:
-                for asteroid in asteroids:
-                    if check_collision(player.x, player.y, player.size, asteroid.x, asteroid.y, asteroid.radius):
-                        lives -= 1
-                        sound_manager.play('explosion')
-                        particles.extend(asteroid.get_explosion_particles())
-                        player.reset_position()
-
-                        if lives <= 0:
-                            if score > high_score:
-                                high_score = score
-                            game_data['high_score'] = high_score
-                            game_data['coins'] = coins
-                            save_game_data(game_data)
-                            game_state = GameState.GAME_OVER
-                        break
-
-            if not asteroids:
-                asteroids = spawn_asteroids(3 + score // 1500, player)
-
-        screen.fill(BLACK)
-
-        # Draw colorful starfield background for all game states
-        draw_starfield(screen, stars)
-
-        if game_state == GameState.PLAYING or game_state == GameState.PAUSED:
-            player.draw(screen, ship_skin)
+        profiler.lap('input')
 
-            for bullet in bullets:
-                bullet.draw(screen)
-
-            for asteroid in asteroids:
-                asteroid.draw(screen)
-
-            for particle in particles:
-                particle.draw(screen)
-
-            # Colorful and enhanced UI elements
-            score_text = font.render(f"Score: {score}", True, ELECTRIC_BLUE)
-            screen.blit(score_text, (10, 10))
-
-            # Color-coded lives indicator
-            if lives >= 3:
-                lives_color = BRIGHT_GREEN
-            elif lives == 2:
-                lives_color = YELLOW
-            else:
-                lives_color = BRIGHT_RED
-
-            lives_text = font.render(f"Lives: {lives}", True, lives_color)
-            screen.blit(lives_text, (10, 50))
-
-            # Draw health bar visualization
-            bar_width = 100
-            bar_height = 8
-            bar_x = 10
-            bar_y = 75
-
-            # Background bar
-            pygame.draw.rect(screen, (40, 40, 40), (bar_x, bar_y, bar_width, bar_height))
-
-            # Health bar segments
-            segment_width = bar_width // 3
-            for i in range(lives):
-                if i == 0:
-                    segment_color = BRIGHT_GREEN if lives >= 3 else (YELLOW if lives == 2 else BRIGHT_RED)
-                elif i == 1:
-                    segment_color = BRIGHT_GREEN if lives >= 2 else YELLOW
-                else:
-                    segment_color = BRIGHT_GREEN
-
-                pygame.draw.rect(screen, segment_color,
-                               (bar_x + i * segment_width + 2, bar_y + 2, segment_width - 4, bar_height - 4))
-
-            high_score_text = font.render(f"High Score: {high_score}", True, GOLD)
-            screen.blit(high_score_text, (10, 100))
-
-            coins_text = font.render(f"Coins: {coins}", True, BRIGHT_GREEN)
-            screen.blit(coins_text, (10, 130))
-
-            # Add shield indicator
-            if player.shield_active:
-                shield_text = font.render("SHIELD ACTIVE", True, CYAN)
-                screen.blit(shield_text, (WIDTH - 150, 10))
-
-                # Shield timer bar
-                shield_ratio = player.shield_time / 180
-                shield_bar_width = 120
-                shield_bar_height = 6
-                pygame.draw.rect(screen, (40, 40, 40), (WIDTH - 140, 35, shield_bar_width, shield_bar_height))
-                pygame.draw.rect(screen, CYAN, (WIDTH - 138, 37, int(shield_bar_width * shield_ratio - 4), shield_bar_height - 4))
-
-            if game_state == GameState.PAUSED:
-                draw_text(screen, "PAUSED", 72, WIDTH//2, HEIGHT//2, YELLOW)
-                draw_text(screen, "Press P to resume", 36, WIDTH//2, HEIGHT//2 + 50, WHITE)
-
-        elif game_state == GameState.MENU:
-            draw_text(screen, "ASTEROIDS", 96, WIDTH//2, HEIGHT//2 - 100, WHITE)
-            draw_text(screen, "Enhanced Edition", 36, WIDTH//2, HEIGHT//2 - 60, YELLOW)
-
-            draw_text(screen, "CONTROLS:", 36, WIDTH//2, HEIGHT//2 - 10, GREEN)
-            draw_text(screen, "Arrow Keys - Move & Rotate", 28, WIDTH//2, HEIGHT//2 + 20, WHITE)
-            draw_text(screen, "Space - Shoot", 28, WIDTH//2, HEIGHT//2 + 45, WHITE)
-            draw_text(screen, "X - Shield (if owned)", 28, WIDTH//2, HEIGHT//2 + 70, WHITE)
-            draw_text(screen, "P - Pause", 28, WIDTH//2, HEIGHT//2 + 95, WHITE)
-
-            draw_text(screen, f"High Score: {high_score}", 28, WIDTH//2, HEIGHT//2 + 115, YELLOW)
-            draw_text(screen, f"Coins: {coins}", 28, WIDTH//2, HEIGHT//2 + 140, YELLOW)
-
-            draw_text(screen, "Press ENTER to Start", 42, WIDTH//2, HEIGHT//2 + 175, GREEN)
-            draw_text(screen, "Press S for Shop", 28, WIDTH//2, HEIGHT//2 + 210, BLUE)
-            draw_text(screen, "Press H for Ship Select", 28, WIDTH//2, HEIGHT//2 + 235, (255, 165, 0))
-            draw_text(screen, "Press O for Sound Settings", 28, WIDTH//2, HEIGHT//2 + 260, (255, 100, 255))
-            draw_text(screen, "Press N for New Game", 28, WIDTH//2, HEIGHT//2 + 285, RED)
-
-        elif game_state == GameState.SHOP:
-            draw_text(screen, "SHOP", 72, WIDTH//2, 80, WHITE)
-            draw_text(screen, f"Coins: {coins}", 36, WIDTH//2, 130, YELLOW)
-
-            items = [
-                ("MULTI SHOT LV1", 300, multi_shot_level >= 1),
-                ("MULTI SHOT LV2", 800, multi_shot_level >= 2),
-                ("SHIELD", 500, shield_level >= 1),
-                ("RAPID FIRE", 350, rapid_fire_level >= 1)
-            ]
-
-            for i, (item_name, price, owned) in enumerate(items):
-                y_pos = 170 + i * 35
-                color = WHITE
-
-                if i == shop_selection:
-                    color = GREEN
-                    pygame.draw.rect(screen, (0, 50, 0), (WIDTH//2 - 180, y_pos - 15, 360, 30), 2)
-
-                if owned:
-                    draw_text(screen, f"{item_name} - OWNED", 24, WIDTH//2, y_pos, color)
-                else:
-                    can_afford = coins >= price
-                    draw_text(screen, f"{item_name} - {price} coins", 24, WIDTH//2, y_pos, color)
-
-            draw_text(screen, "Use UP/DOWN arrows to select", 24, WIDTH//2, HEIGHT - 80, WHITE)
-            draw_text(screen, "ENTER to buy, ESC to return", 24, WIDTH//2, HEIGHT - 50, WHITE)
-
-        elif game_state == GameState.SHIP_SELECT:
-            draw_text(screen, "SHIP HANGAR", 72, WIDTH//2, 80, WHITE)
-            draw_text(screen, f"Coins: {coins}", 36, WIDTH//2, 130, YELLOW)
-
-            draw_text(screen, "OWNED SHIPS:", 36, WIDTH//2, 170, GREEN)
-
-            for i, ship_name in enumerate(owned_ships):
-                y_pos = 210 + i * 40
-                color = WHITE
-                ship_display_name = ship_name.upper().replace('_', ' ')
-
-                if i == ship_selection:
-                    color = GREEN
-                    pygame.draw.rect(screen, (0, 50, 0), (WIDTH//2 - 150, y_pos - 15, 300, 30), 2)
-
-                if ship_name == ship_skin:
-                    draw_text(screen, f"{ship_display_name} - ACTIVE", 28, WIDTH//2, y_pos, color)
+        # Run as many fixed simulation steps as the elapsed time covers
+        alpha = 1.0
+        if game_state == GameState.PLAYING:
+            accumulator += min(frame_time, MAX_FRAME_TIME)
+            while accumulator >= SIM_DT and game_state == GameState.PLAYING:
+                accumulator -= SIM_DT
+                controls = controller.controls(world)
+                if record and world.steps == 0:
+                    recorded_games += 1
+                    recorder = InputRecorder(world.seed, {
+                        'multi_shot_level': multi_shot_level,
+                        'shield_level': shield_level,
+                        'rapid_fire_level': rapid_fire_level,
+                        'speed_boost_level': speed_boost_level,
+                    }, world.coins)
+                    try:
+                        recorder.check(recording_path(record, recorded_games))
+                    except (OSError, struct.error) as error:
+                        print(f"Not recording this game: {error}", file=sys.stderr)
+                        recorder = None
+                if recorder is not None:
+                    recorder.record(controls, paused)
+                paused = False
+                if world.step(controls, multi_shot_level, shield_level, rapid_fire_level, speed_boost_level):
+                    coins = world.coins
+                    if world.score > high_score:
+                        high_score = world.score
+                    game_data['high_score'] = high_score
+                    game_data['coins'] = coins
+                    game_data_writer.save(game_data)
+                    if recorder is not None:
+                        save_recording(recorder, recording_path(record, recorded_games), world.score)
+                        recorder = None
+                    game_state = GameState.GAME_OVER
+            alpha = accumulator / SIM_DT
+        else:
+            accumulator = 0.0
+
+        if game_state == GameState.MENU:
+            # Synthesize effects in the background while the player reads the menu
+            sound_manager.warm_up()
+
+        # A static screen is only redrawn when something it shows changes
+        ui_key = None
+        if game_state in STATIC_SCREENS and not profiler.visible:
+            ui_key = (game_state, coins, high_score, world.score, ship_skin, tuple(owned_ships),
+                      multi_shot_level, shield_level, rapid_fire_level,
+                      shop_selection, ship_selection, sound_selection,
+                      sound_manager.music_volume, sound_manager.sfx_volume,
+                      sound_manager.music_enabled, sound_manager.sfx_enabled, sound_manager.is_ready())
+
+        idle = ui_key is not None and ui_key == drawn_ui_key
+        stars.twinkle_groups = quality.settings.twinkle_groups
+        if not idle:
+            # Draw colorful starfield background for all game states
+            draw_starfield(screen, stars)
+            profiler.lap('starfield')
+
+            if game_state == GameState.PLAYING or game_state == GameState.PAUSED:
+                world.draw(screen, ship_skin, alpha)
+                profiler.lap('entities')
+                score = world.score
+                lives = world.lives
+
+                # Colorful and enhanced UI elements
+                score_text = text_renderer.render(f"Score: {score}", hud_font_size, ELECTRIC_BLUE)
+                screen.blit(score_text, (10, 10))
+
+                # Color-coded lives indicator
+                if lives >= 3:
+                    lives_color = BRIGHT_GREEN
+                elif lives == 2:
+                    lives_color = YELLOW
                 else:
-                    draw_text(screen, ship_display_name, 28, WIDTH//2, y_pos, color)
-
-            available_ships = ['astro', 'fighter', 'stealth', 'classic']
-            prices = [500, 750, 600, 400]
-            unowned_ships = [(ship, price) for ship, price in zip(available_ships, prices) if ship not in owned_ships]
-
-            if unowned_ships:
-                draw_text(screen, "AVAILABLE FOR PURCHASE:", 32, WIDTH//2, 350, BLUE)
-                for i, (ship_name, price) in enumerate(unowned_ships):
-                    y_pos = 380 + i * 30
+                    lives_color = BRIGHT_RED
+
+                lives_text = text_renderer.render(f"Lives: {lives}", hud_font_size, lives_color)
+                screen.blit(lives_text, (10, 50))
+
+                # Draw health bar visualization
+                bar_width = 100
+                bar_height = 8
+                bar_x = 10
+                bar_y = 75
+
+                # Background bar
+                pygame.draw.rect(screen, (40, 40, 40), (bar_x, bar_y, bar_width, bar_height))
+
+                # Health bar segments
+                segment_width = bar_width // 3
+                for i in range(lives):
+                    if i == 0:
+                        segment_color = BRIGHT_GREEN if lives >= 3 else (YELLOW if lives == 2 else BRIGHT_RED)
+                    elif i == 1:
+                        segment_color = BRIGHT_GREEN if lives >= 2 else YELLOW
+                    else:
+                        segment_color = BRIGHT_GREEN
+
+                    pygame.draw.rect(screen, segment_color,
+                                   (bar_x + i * segment_width + 2, bar_y + 2, segment_width - 4, bar_height - 4))
+
+                high_score_text = text_renderer.render(f"High Score: {high_score}", hud_font_size, GOLD)
+                screen.blit(high_score_text, (10, 100))
+
+                coins_text = text_renderer.render(f"Coins: {world.coins}", hud_font_size, BRIGHT_GREEN)
+                screen.blit(coins_text, (10, 130))
+
+                # Add shield indicator
+                if world.player.shield_active:
+                    shield_text = text_renderer.render("SHIELD ACTIVE", hud_font_size, CYAN)
+                    screen.blit(shield_text, (WIDTH - 150, 10))
+
+                    # Shield timer bar
+                    shield_ratio = world.player.shield_time / 180
+                    shield_bar_width = 120
+                    shield_bar_height = 6
+                    pygame.draw.rect(screen, (40, 40, 40), (WIDTH - 140, 35, shield_bar_width, shield_bar_height))
+                    pygame.draw.rect(screen, CYAN, (WIDTH - 138, 37, int(shield_bar_width * shield_ratio - 4), shield_bar_height - 4))
+
+                if game_state == GameState.PAUSED:
+                    draw_text(screen, "PAUSED", 72, WIDTH//2, HEIGHT//2, YELLOW)
+                    draw_text(screen, "Press P to resume", 36, WIDTH//2, HEIGHT//2 + 50, WHITE)
+
+            elif game_state == GameState.MENU:
+                if not sound_manager.is_ready():
+                    draw_text(screen, "Loading sounds...", 20, WIDTH - 80, 20, SILVER)
+
+                draw_text(screen, "ASTEROIDS", 96, WIDTH//2, HEIGHT//2 - 100, WHITE)
+                draw_text(screen, "Enhanced Edition", 36, WIDTH//2, HEIGHT//2 - 60, YELLOW)
+
+                draw_text(screen, "CONTROLS:", 36, WIDTH//2, HEIGHT//2 - 10, GREEN)
+                draw_text(screen, "Arrow Keys - Move & Rotate", 28, WIDTH//2, HEIGHT//2 + 20, WHITE)
+                draw_text(screen, "Space - Shoot", 28, WIDTH//2, HEIGHT//2 + 45, WHITE)
+                draw_text(screen, "X - Shield (if owned)", 28, WIDTH//2, HEIGHT//2 + 70, WHITE)
+                draw_text(screen, "P - Pause", 28, WIDTH//2, HEIGHT//2 + 95, WHITE)
+
+                draw_text(screen, f"High Score: {high_score}", 28, WIDTH//2, HEIGHT//2 + 115, YELLOW)
+                draw_text(screen, f"Coins: {coins}", 28, WIDTH//2, HEIGHT//2 + 140, YELLOW)
+
+                draw_text(screen, "Press ENTER to Start", 42, WIDTH//2, HEIGHT//2 + 175, GREEN)
+                draw_text(screen, "Press S for Shop", 28, WIDTH//2, HEIGHT//2 + 210, BLUE)
+                draw_text(screen, "Press H for Ship Select", 28, WIDTH//2, HEIGHT//2 + 235, (255, 165, 0))
+                draw_text(screen, "Press O for Sound Settings", 28, WIDTH//2, HEIGHT//2 + 260, (255, 100, 255))
+                draw_text(screen, "Press N for New Game", 28, WIDTH//2, HEIGHT//2 + 285, RED)
+
+            elif game_state == GameState.SHOP:
+                draw_text(screen, "SHOP", 72, WIDTH//2, 80, WHITE)
+                draw_text(screen, f"Coins: {coins}", 36, WIDTH//2, 130, YELLOW)
+
+                levels = {
+                    'multi_shot_level': multi_shot_level,
+                    'shield_level': shield_level,
+                    'rapid_fire_level': rapid_fire_level,
+                }
+
+                for i, (item_name, price, field, level) in enumerate(SHOP_ITEMS):
+                    owned = levels[field] >= level
+                    y_pos = 170 + i * 35
+                    color = WHITE
+
+                    if i == shop_selection:
+                        color = GREEN
+                        pygame.draw.rect(screen, (0, 50, 0), (WIDTH//2 - 180, y_pos - 15, 360, 30), 2)
+
+                    if owned:
+                        draw_text(screen, f"{item_name} - OWNED", 24, WIDTH//2, y_pos, color)
+                    else:
+                        can_afford = coins >= price
+                        draw_text(screen, f"{item_name} - {price} coins", 24, WIDTH//2, y_pos, color)
+
+                draw_text(screen, "Use UP/DOWN arrows to select", 24, WIDTH//2, HEIGHT - 80, WHITE)
+                draw_text(screen, "ENTER to buy, ESC to return", 24, WIDTH//2, HEIGHT - 50, WHITE)
+
+            elif game_state == GameState.SHIP_SELECT:
+                draw_text(screen, "SHIP HANGAR", 72, WIDTH//2, 80, WHITE)
+                draw_text(screen, f"Coins: {coins}", 36, WIDTH//2, 130, YELLOW)
+
+                draw_text(screen, "OWNED SHIPS:", 36, WIDTH//2, 170, GREEN)
+
+                for i, ship_name in enumerate(owned_ships):
+                    y_pos = 210 + i * 40
+                    color = WHITE
                     ship_display_name = ship_name.upper().replace('_', ' ')
-                    can_afford = coins >= price
-                    color = GREEN if can_afford else RED
-                    draw_text(screen, f"{ship_display_name} - {price} coins", 24, WIDTH//2, y_pos, color)
-
-            draw_text(screen, "UP/DOWN to select, ENTER to equip", 20, WIDTH//2, HEIGHT - 80, WHITE)
-            draw_text(screen, "B to buy next affordable ship", 20, WIDTH//2, HEIGHT - 60, WHITE)
-            draw_text(screen, "ESC to return to menu", 20, WIDTH//2, HEIGHT - 40, WHITE)
-
-        elif game_state == GameState.SOUND_SETTINGS:
-            draw_text(screen, "SOUND SETTINGS", 72, WIDTH//2, 80, WHITE)
-
-            settings_options = [
-                f"Music Volume: {int(sound_manager.music_volume * 100)}%",
-                f"SFX Volume: {int(sound_manager.sfx_volume * 100)}%",
-                f"Background Music: {'ON' if sound_manager.music_enabled else 'OFF'}",
-                f"Sound Effects: {'ON' if sound_manager.sfx_enabled else 'OFF'}"
-            ]
-
-            for i, option in enumerate(settings_options):
-                y_pos = 150 + i * 40
-                color = WHITE
-
-                if i == sound_selection:
-                    color = GREEN
-                    pygame.draw.rect(screen, (0, 50, 0), (WIDTH//2 - 200, y_pos - 15, 400, 30), 2)
-
-                draw_text(screen, option, 28, WIDTH//2, y_pos, color)
-
-            draw_text(screen, "Use UP/DOWN to select", 24, WIDTH//2, HEIGHT - 120, WHITE)
-            draw_text(screen, "Use LEFT/RIGHT to adjust", 24, WIDTH//2, HEIGHT - 90, WHITE)
-            draw_text(screen, "ESC to return to menu", 24, WIDTH//2, HEIGHT - 60, WHITE)
-
-        elif game_state == GameState.NEW_GAME_CONFIRM:
-            # Semi-transparent overlay
-            overlay = pygame.Surface((WIDTH, HEIGHT))
-            overlay.set_alpha(128)
-            overlay.fill(BLACK)
-            screen.blit(overlay, (0, 0))
-
-            # Confirmation dialog box
-            dialog_width = 500
-            dialog_height = 200
-            dialog_x = WIDTH // 2 - dialog_width // 2
-            dialog_y = HEIGHT // 2 - dialog_height // 2
-
-            pygame.draw.rect(screen, (40, 40, 40), (dialog_x, dialog_y, dialog_width, dialog_height))
-            pygame.draw.rect(screen, WHITE, (dialog_x, dialog_y, dialog_width, dialog_height), 3)
-
-            draw_text(screen, "NEW GAME", 48, WIDTH//2, dialog_y + 40, RED)
-            draw_text(screen, "This will reset ALL progress except high score!", 24, WIDTH//2, dialog_y + 80, YELLOW)
-            draw_text(screen, "You will lose all coins, ships, and upgrades!", 24, WIDTH//2, dialog_y + 105, YELLOW)
-
-            draw_text(screen, "Are you sure?", 32, WIDTH//2, dialog_y + 140, WHITE)
-            draw_text(screen, "Press Y to confirm, N to cancel", 28, WIDTH//2, dialog_y + 170, GREEN)
-
-        elif game_state == GameState.GAME_OVER:
-            draw_text(screen, "GAME OVER", 72, WIDTH//2, HEIGHT//2 - 50, RED)
-            draw_text(screen, f"Final Score: {score}", 48, WIDTH//2, HEIGHT//2, WHITE)
-            draw_text(screen, f"High Score: {high_score}", 36, WIDTH//2, HEIGHT//2 + 40, YELLOW)
-            draw_text(screen, "Press R to restart", 36, WIDTH//2, HEIGHT//2 + 80, GREEN)
-            draw_text(screen, "Press M for menu", 36, WIDTH//2, HEIGHT//2 + 115, BLUE)
 
-        pygame.display.flip()
-        clock.tick(FPS)
+                    if i == ship_selection:
+                        color = GREEN
+                        pygame.draw.rect(screen, (0, 50, 0), (WIDTH//2 - 150, y_pos - 15, 300, 30), 2)
+
+                    if ship_name == ship_skin:
+                        draw_text(screen, f"{ship_display_name} - ACTIVE", 28, WIDTH//2, y_pos, color)
+                    else:
+                        draw_text(screen, ship_display_name, 28, WIDTH//2, y_pos, color)
+
+                unowned_ships = [(ship, price) for ship, price in SHIP_PRICES.items() if ship not in owned_ships]
+
+                if unowned_ships:
+                    draw_text(screen, "AVAILABLE FOR PURCHASE:", 32, WIDTH//2, 350, BLUE)
+                    for i, (ship_name, price) in enumerate(unowned_ships):
+                        y_pos = 380 + i * 30
+                        ship_display_name = ship_name.upper().replace('_', ' ')
+                        can_afford = coins >= price
+                        color = GREEN if can_afford else RED
+                        draw_text(screen, f"{ship_display_name} - {price} coins", 24, WIDTH//2, y_pos, color)
+
+                draw_text(screen, "UP/DOWN to select, ENTER to equip", 20, WIDTH//2, HEIGHT - 80, WHITE)
+                draw_text(screen, "B to buy next affordable ship", 20, WIDTH//2, HEIGHT - 60, WHITE)
+                draw_text(screen, "ESC to return to menu", 20, WIDTH//2, HEIGHT - 40, WHITE)
+
+            elif game_state == GameState.SOUND_SETTINGS:
+                draw_text(screen, "SOUND SETTINGS", 72, WIDTH//2, 80, WHITE)
+
+                settings_options = [
+                    f"Music Volume: {int(sound_manager.music_volume * 100)}%",
+                    f"SFX Volume: {int(sound_manager.sfx_volume * 100)}%",
+                    f"Background Music: {'ON' if sound_manager.music_enabled else 'OFF'}",
+                    f"Sound Effects: {'ON' if sound_manager.sfx_enabled else 'OFF'}"
+                ]
 
+                for i, option in enumerate(settings_options):
+                    y_pos = 150 + i * 40
+                    color = WHITE
+
+                    if i == sound_selection:
+                        color = GREEN
+                        pygame.draw.rect(screen, (0, 50, 0), (WIDTH//2 - 200, y_pos - 15, 400, 30), 2)
+
+                    draw_text(screen, option, 28, WIDTH//2, y_pos, color)
+
+                draw_text(screen, "Use UP/DOWN to select", 24, WIDTH//2, HEIGHT - 120, WHITE)
+                draw_text(screen, "Use LEFT/RIGHT to adjust", 24, WIDTH//2, HEIGHT - 90, WHITE)
+                draw_text(screen, "ESC to return to menu", 24, WIDTH//2, HEIGHT - 60, WHITE)
+
+            elif game_state == GameState.NEW_GAME_CONFIRM:
+                # Semi-transparent overlay
+                screen.blit(confirm_overlay, (0, 0))
+
+                # Confirmation dialog box
+                dialog_width = 500
+                dialog_height = 200
+                dialog_x = WIDTH // 2 - dialog_width // 2
+                dialog_y = HEIGHT // 2 - dialog_height // 2
+
+                pygame.draw.rect(screen, (40, 40, 40), (dialog_x, dialog_y, dialog_width, dialog_height))
+                pygame.draw.rect(screen, WHITE, (dialog_x, dialog_y, dialog_width, dialog_height), 3)
+
+                draw_text(screen, "NEW GAME", 48, WIDTH//2, dialog_y + 40, RED)
+                draw_text(screen, "This will reset ALL progress except high score!", 24, WIDTH//2, dialog_y + 80, YELLOW)
+                draw_text(screen, "You will lose all coins, ships, and upgrades!", 24, WIDTH//2, dialog_y + 105, YELLOW)
+
+                draw_text(screen, "Are you sure?", 32, WIDTH//2, dialog_y + 140, WHITE)
+                draw_text(screen, "Press Y to confirm, N to cancel", 28, WIDTH//2, dialog_y + 170, GREEN)
+
+            elif game_state == GameState.GAME_OVER:
+                draw_text(screen, "GAME OVER", 72, WIDTH//2, HEIGHT//2 - 50, RED)
+                draw_text(screen, f"Final Score: {world.score}", 48, WIDTH//2, HEIGHT//2, WHITE)
+                draw_text(screen, f"Seed: {rng.session_seed}", 20, WIDTH - 80, HEIGHT - 20, SILVER)
+                draw_text(screen, f"High Score: {high_score}", 36, WIDTH//2, HEIGHT//2 + 40, YELLOW)
+                draw_text(screen, "Press R to restart", 36, WIDTH//2, HEIGHT//2 + 80, GREEN)
+                draw_text(screen, "Press M for menu", 36, WIDTH//2, HEIGHT//2 + 115, BLUE)
+
+            profiler.draw(screen)
+            profiler.lap('hud')
+            if ui_key is not None:
+                stars.cover(screen)
+                profiler.lap('starfield')
+            drawn_ui_key = ui_key
+            pygame.display.flip()
+        else:
+            dirty_rects = stars.refresh(screen)
+            profiler.lap('starfield')
+            pygame.display.update(dirty_rects)
+        profiler.lap('flip')
+        profiler.end_frame((len(world.bullets), len(world.asteroids), len(world.particles)), world.budget_hits)
+        if game_state == GameState.PLAYING:
+            # Only gameplay frames say anything about the cost of the effects
+            quality.update(profiler.current.sum() / 1e9)
+        sound_manager.update()
+        frame_time = pacer.wait(idle)
+
+    game_data_writer.close()
+    if profile_trace:
+        profiler.export(profile_trace)
     pygame.quit()
     sys.exit()
 
+def seed_value(text):
+    # --seed type: SeedSequence needs a non-negative int, the replay header 64 bits
+    try:
+        seed = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"seed must be an integer, got {text!r}")
+    if not 0 <= seed < 2**64:
+        raise argparse.ArgumentTypeError(f"seed must be between 0 and 2**64 - 1, got {seed}")
+    return seed
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Enhanced Asteroids")
+    parser.add_argument('--warm-sound-cache', action='store_true',
+                        help="render all sounds into the on-disk cache and exit")
+    parser.add_argument('--clear-sound-cache', action='store_true',
+                        help="delete all cached sounds before starting")
+    parser.add_argument('--no-sound-cache', action='store_true',
+                        help="always synthesize sounds instead of using the cache")
+    parser.add_argument('--collision-engine', choices=sorted(COLLISION_ENGINES), default='grid',
+                        help="bullet/asteroid collision pass (default: grid)")
+    parser.add_argument('--render-fps', type=int, default=FPS,
+                        help="cap on rendered frames per second, 0 for uncapped; "
+                             "the simulation always runs at %d Hz (default: %d)" % (FPS, FPS))
+    parser.add_argument('--headless', action='store_true',
+                        help="play one game with a random pilot and no window or audio, then print the result")
+    parser.add_argument('--max-steps', type=int, default=FPS * 60 * 10,
+                        help="simulation steps before a headless game is cut off (default: %(default)s)")
+    parser.add_argument('--balance', type=int, metavar='GAMES',
+                        help="play GAMES headless games per shop loadout across all cores and "
+                             "print score, survival, coin and wave statistics")
+    parser.add_argument('--pilot', choices=sorted(BALANCE_PILOTS), default='aiming',
+                        help="AI pilot for --balance (default: aiming)")
+    parser.add_argument('--workers', type=int,
+                        help="worker processes for --balance (default: one per core)")
+    parser.add_argument('--seed', type=seed_value,
+                        help="session seed for the gameplay, visual and audio random streams; "
+                             "--balance game i uses seed + i (default: random, 0 for --balance)")
+    parser.add_argument('--record', metavar='FILE',
+                        help="record each game's seed and input to FILE (later games to FILE-2, FILE-3...)")
+    parser.add_argument('--replay', metavar='FILE',
+                        help="play back a recording in a window, or as fast as possible with --headless")
+    parser.add_argument('--profile-trace', metavar='FILE',
+                        help="write per-frame phase timings and entity counts to FILE (.csv or .json) on exit")
+    parser.add_argument('--idle-fps', type=int, default=IDLE_FPS,
+                        help="frame rate of menus and other static screens once nobody is touching them; "
+                             "0 wakes only for input (default: %(default)s)")
+    parser.add_argument('--idle-delay', type=float, default=IDLE_DELAY,
+                        help="seconds without input before a static screen slows down (default: %(default)s)")
+    parser.add_argument('--quality', choices=['auto'] + [level.name for level in QUALITY_LEVELS], default='auto',
+                        help="visual detail level; auto (default) lowers it while frames run over budget")
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parse_args()
+    if args.clear_sound_cache:
+        SoundCache().clear()
+    if args.warm_sound_cache:
+        SoundManager(cache=SoundCache(), start_music=False).warm_cache()
+        sys.exit()
+    if args.replay:
+        replay = Replay.load(args.replay)
+        start = time.perf_counter()
+        if args.headless:
+            world = run_replay(replay, args.collision_engine)
+        else:
+            world = watch_replay(replay, args.collision_engine, args.render_fps)
+            pygame.quit()
+        elapsed = time.perf_counter() - start
+        print(f"seed {replay.seed}  steps {world.steps}/{len(replay)}  pauses {replay.pauses}  "
+              f"score {world.score} (recorded {replay.score})  lives {world.lives}  coins {world.coins}  "
+              f"({world.steps / max(elapsed, 1e-9):.0f} steps/s)")
+        sys.exit(0 if world.steps < len(replay) or world.score == replay.score else 1)
+    if args.headless:
+        start = time.perf_counter()
+        rng.reseed(args.seed)
+        world = run_headless(RandomController(rng.session_seed), args.max_steps, args.collision_engine,
+                             seed=rng.session_seed)
+        elapsed = time.perf_counter() - start
+        print(f"seed {rng.session_seed}  score {world.score}  lives {world.lives}  coins {world.coins}  steps {world.steps}  "
+              f"({world.steps / max(elapsed, 1e-9):.0f} steps/s)")
+        if any(world.budget_hits.values()):
+            print("budget hits  " + "  ".join(f"{name} {count}" for name, count in world.budget_hits.items()))
+        sys.exit()
+    if args.balance:
+        print_balance_report(run_balance(args.balance, args.pilot, args.workers, args.seed or 0,
+                                         args.max_steps, args.collision_engine))
+        sys.exit()
+    main(sound_cache=False if args.no_sound_cache else None, collision_engine=args.collision_engine,
+         render_fps=args.render_fps, seed=args.seed, record=args.record,
+         profile_trace=args.profile_trace, idle_fps=args.idle_fps, idle_delay=args.idle_delay,
+         quality_level=None if args.quality == 'auto' else [level.name for level in QUALITY_LEVELS].index(args.quality))
\ No newline at end of file
@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+# Hot-path benchmarks for asteroids_game.py. Everything runs on the SDL dummy
+# drivers with fixed seeds, so runs on one machine are comparable. Results are
+# printed, optionally written as JSON, and compared against baseline.json.
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy as np
+import pygame
+import asteroids_game as game
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+SEED = 1234
+TOLERANCE = 0.25  # Slowdown against the baseline that counts as a regression
+MIN_SAMPLE_NS = 5_000_000  # Fast calls are looped until one sample takes this long
+
+# name -> (setup, repeat). setup() builds the fixtures and returns the
+# zero-argument callable that gets timed.
+BENCHMARKS = {}
+
+PARTICLE_COLORS = [game.YELLOW, game.ORANGE, game.WHITE, game.CYAN, game.GOLD, game.HOT_PINK]
+
+def benchmark(name, repeat=20):
+    def register(setup):
+        BENCHMARKS[name] = (setup, repeat)
+        return setup
+    return register
+
+def register_sound_benchmarks():
+    for effect, ((method, params), fallback) in game.SoundManager.effects.items():
+        def setup(method=method, params=params):
+            # No music, so no stream thread synthesizes in the background
+            sound_manager = game.SoundManager(seed=SEED, cache=False, start_music=False)
+            return lambda: getattr(sound_manager, method)(*params)
+        benchmark(f"sound/{method}", repeat=10)(setup)
+
+@benchmark("sound/music_45s", repeat=3)
+def music():
+    sound_manager = game.SoundManager(seed=SEED, cache=False, start_music=False)
+    return sound_manager.create_background_music
+
+def particle_system(count):
+    particles = game.ParticleSystem(seed=SEED)
+    generator = np.random.default_rng(SEED)
+    particles.emit(
+        generator.uniform(0, game.WIDTH, count), generator.uniform(0, game.HEIGHT, count),
+        generator.uniform(-3, 3, count), generator.uniform(-3, 3, count),
+        [PARTICLE_COLORS[i % len(PARTICLE_COLORS)] for i in range(count)],
+        10**6  # Nothing dies, so every timed call sees the full count
+    )
+    for _ in range(game.PARTICLE_TRAIL_LENGTH):
+        particles.update()
+    return particles
+
+def register_particle_benchmarks():
+    for count in (1000, 10000):
+        benchmark(f"particles/update/{count}")(lambda count=count: particle_system(count).update)
+        def draw(count=count):
+            particles = particle_system(count)
+            # A fixed pulse, so every sample blits the same already-rendered
+            # glow sprites whatever the wall clock says
+            return lambda: particles.draw(game.screen, now=0.0)
+        benchmark(f"particles/draw/{count}")(draw)
+
+def collision_fixture(bullet_count, asteroid_count):
+    player = game.Player(game.WIDTH // 2, game.HEIGHT // 2)
+    asteroids = [game.Asteroid(x, y, size)
+                 for (x, y), size in zip(game.rng.gameplay.uniform((0, 0), (game.WIDTH, game.HEIGHT), (asteroid_count, 2)).tolist(),
+                                         game.rng.gameplay.integers(1, 4, asteroid_count).tolist())]
+    bullets = [game.Bullet(x, y, angle)
+               for x, y, angle in game.rng.gameplay.uniform((0, 0, 0), (game.WIDTH, game.HEIGHT, 360), (bullet_count, 3)).tolist()]
+    return player, bullets, asteroids
+
+def register_collision_benchmarks():
+    for bullet_count, asteroid_count in ((10, 10), (50, 50), (200, 200)):
+        for engine, find_hits in game.COLLISION_ENGINES.items():
+            def setup(bullet_count=bullet_count, asteroid_count=asteroid_count, find_hits=find_hits):
+                player, bullets, asteroids = collision_fixture(bullet_count, asteroid_count)
+                grid = game.SpatialHash(game.ASTEROID_MAX_RADIUS)
+                return lambda: find_hits(bullets, asteroids, grid)
+            benchmark(f"collisions/{engine}/{bullet_count}x{asteroid_count}")(setup)
+
+@benchmark("draw/asteroids/20")
+def draw_asteroids():
+    player, bullets, asteroids = collision_fixture(0, 20)
+    return lambda: game.draw_asteroids(game.screen, asteroids)
+
+def register_player_benchmarks():
+    for skin in game.SHIP_SKINS:
+        def setup(skin=skin):
+            player = game.Player(game.WIDTH // 2, game.HEIGHT // 2)
+            player.shield_active = True
+            # The shield pulse follows the wall clock; render every step up front
+            for step in range(game.SHIELD_PULSE_STEPS + 1):
+                game.ship_sprites.shield(step / game.SHIELD_PULSE_STEPS)
+            def draw():
+                player.angle += 7  # Walk through the rotation cache like real play
+                player.draw(game.screen, skin)
+            return draw
+        benchmark(f"draw/player/{skin}")(setup)
+
+@benchmark("draw/starfield")
+def draw_starfield():
+    stars = game.create_starfield(200)
+    return lambda: game.draw_starfield(game.screen, stars)
+
+@benchmark("draw/text/cached", repeat=20)
+def draw_text_cached():
+    return lambda: game.draw_text(game.screen, "Score: 12345", 36, game.WIDTH // 2, 20, game.WHITE)
+
+@benchmark("draw/text/changing", repeat=20)
+def draw_text_changing():
+    counter = iter(range(10**9))
+    return lambda: game.draw_text(game.screen, f"Score: {next(counter)}", 36, game.WIDTH // 2, 20, game.WHITE)
+
+@benchmark("simulation/600_steps", repeat=5)
+def simulation():
+    return lambda: game.run_headless(game.AimingController(SEED), 600, seed=SEED)
+
+def run(names):
+    results = {}
+    for name in names:
+        setup, repeat = BENCHMARKS[name]
+        game.rng.reseed(SEED)
+        call = setup()
+        # Like timeit's autorange: the first (warm-up) sample also picks how
+        # many calls each sample needs to rise above timer noise
+        number = 1
+        while True:
+            start = time.perf_counter_ns()
+            for _ in range(number):
+                call()
+            if time.perf_counter_ns() - start >= MIN_SAMPLE_NS or number >= 1000:
+                break
+            number *= 2
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter_ns()
+            for _ in range(number):
+                call()
+            times.append((time.perf_counter_ns() - start) / number)
+        times = np.array(times) / 1e6
+        results[name] = {
+            'median_ms': round(float(np.median(times)), 4),
+            'min_ms': round(float(times.min()), 4),
+            'repeat': repeat,
+            'number': number,
+        }
+        print(f"{name:<40}{results[name]['min_ms']:>12.4f} ms", flush=True)
+    return results
+
+def compare(results, baseline, tolerance):
+    # Returns the names that got slower than the baseline by more than
+    # tolerance. Compares the best sample, which background load disturbs
+    # least; the median is kept in the JSON for reference.
+    regressions = []
+    print()
+    print(f"{'benchmark':<40}{'best':>12}{'baseline':>12}{'change':>10}")
+    for name, result in results.items():
+        if name not in baseline:
+            print(f"{name:<40}{result['min_ms']:>12.4f}{'-':>12}{'new':>10}")
+            continue
+        base = baseline[name]['min_ms']
+        change = result['min_ms'] / base - 1 if base else 0.0
+        flag = ''
+        if change > tolerance:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:<40}{result['min_ms']:>12.4f}{base:>12.4f}{change:>+10.0%}{flag}")
+    return regressions
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the asteroids_game hot paths")
+    parser.add_argument('--filter', default='',
+                        help="only run benchmarks whose name contains this text")
+    parser.add_argument('--output', metavar='FILE',
+                        help="write the results as JSON to FILE")
+    parser.add_argument('--baseline', default=BASELINE_FILE,
+                        help="baseline to compare against (default: benchmarks/baseline.json)")
+    parser.add_argument('--update-baseline', action='store_true',
+                        help="store this run as the new baseline instead of comparing")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                        help="slowdown that counts as a regression (default: %(default)s)")
+    parser.add_argument('--fail-on-regression', action='store_true',
+                        help="exit with status 1 if any benchmark regressed; timings on a busy "
+                             "machine vary a lot between runs, so by default the comparison is only reported")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    game.init_audio()
+    game.init_display()
+    register_sound_benchmarks()
+    register_particle_benchmarks()
+    register_collision_benchmarks()
+    register_player_benchmarks()
+
+    names = sorted(name for name in BENCHMARKS if args.filter in name)
+    report = {
+        'environment': {
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+        },
+        'benchmarks': run(names),
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)['benchmarks']
+        baseline.update(report['benchmarks'])
+        with open(args.baseline, 'w') as f:
+            json.dump(dict(report, benchmarks=dict(sorted(baseline.items()))), f, indent=2)
+            f.write('\n')
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)['benchmarks']
+    regressions = compare(report['benchmarks'], baseline, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) slower than the baseline by more than {args.tolerance:.0%}")
+        if args.fail_on_regression:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())